@@ -35,6 +35,10 @@ from .const import (
     ATTR_CURRENT_ZONE,
     ATTR_TODAY_VOLUME,
     ATTR_TOTAL_TODAY,
+    ATTR_LAST_24H_TOTAL,
+    ATTR_LAST_24H_VOLUME,
+    ATTR_LAST_7D_TOTAL,
+    ATTR_LAST_7D_VOLUME,
     ATTR_SCHEDULE_COUNT,
     ATTR_ADJUSTMENT,
     ATTR_CONFIGURATION,
@@ -305,6 +309,12 @@ class IUZoneEntity(IUEntity):
             1,
         )
         attr[ATTR_TODAY_VOLUME] = self._zone.today_total_volume
+        last_24h = self._zone.last_24h_total
+        attr[ATTR_LAST_24H_TOTAL] = round(last_24h.duration.total_seconds() / 60, 1)
+        attr[ATTR_LAST_24H_VOLUME] = last_24h.volume
+        last_7d = self._zone.last_7d_total
+        attr[ATTR_LAST_7D_TOTAL] = round(last_7d.duration.total_seconds() / 60, 1)
+        attr[ATTR_LAST_7D_VOLUME] = last_7d.volume
         if self._zone.show_config:
             attr[ATTR_CONFIGURATION] = self._zone.configuration
         if self._zone.show_timeline:
@@ -47,6 +47,8 @@ CONF_AUTOPLAY = "autoplay"
 CONF_CHAINS = "chains"
 CONF_CHECK_BACK = "check_back"
 CONF_CLOCK = "clock"
+CONF_COMMAND_QUEUE = "command_queue"
+CONF_CONCURRENCY = "concurrency"
 CONF_CONFIG = "config"
 CONF_CONTROLLER = "controller"
 CONF_CONTROLLERS = "controllers"
@@ -66,8 +68,11 @@ CONF_EXTENDED = "extended"
 CONF_EXTENDED_CONFIG = "extended_config"
 CONF_FINISH = "finish"
 CONF_FIXED = "fixed"
+CONF_FLOW_ACTION = "flow_action"
 CONF_FLOW_RATE_PRECISION = "flow_rate_precision"
 CONF_FLOW_RATE_SCALE = "flow_rate_scale"
+CONF_FLOW_RATE_WINDOW = "flow_rate_window"
+CONF_FLOW_TOLERANCE = "flow_tolerance"
 CONF_FOUND = "found"
 CONF_FROM = "from"
 CONF_FUTURE_SPAN = "future_span"
@@ -79,12 +84,17 @@ CONF_HISTORY_REFRESH = "history_refresh"
 CONF_HISTORY_SPAN = "history_span"
 CONF_INCREASE = "increase"
 CONF_INDEX = "index"
+CONF_INTEGRATIONS = "integrations"
+CONF_LIVE = "live"
 CONF_LOGGING = "logging"
+CONF_LOG_SUMMARY = "log_summary"
 CONF_MAXIMUM = "maximum"
 CONF_MAX_LOG_ENTRIES = "max_log_entries"
 CONF_MINIMUM = "minimum"
 CONF_MODE = "mode"
 CONF_MONTH = "month"
+CONF_NOTIFY = "notify"
+CONF_NOTIFY_INTERVAL = "notify_interval"
 CONF_ODD = "odd"
 CONF_OUTPUT_EVENTS = "output_events"
 CONF_PAUSE_NEXT = "pause_next"
@@ -115,7 +125,9 @@ CONF_SHOW = "show"
 CONF_SHOW_CONFIG = "show_config"
 CONF_SHOW_LOG = "show_log"
 CONF_SHOW_SEQUENCE_STATUS = "show_sequence_status"
+CONF_SPACING = "spacing"
 CONF_SPAN = "span"
+CONF_STATISTICS = "statistics"
 CONF_SPEED = "speed"
 CONF_START = "start"
 CONF_START_N_DAYS = "start_n_days"
@@ -124,6 +136,7 @@ CONF_STATE_OFF = "state_off"
 CONF_STATE_ON = "state_on"
 CONF_SUN = "sun"
 CONF_SYNC_SWITCHES = "sync_switches"
+CONF_TARGET = "target"
 CONF_TESTING = "testing"
 CONF_THRESHOLD = "threshold"
 CONF_TIME = "time"
@@ -165,6 +178,7 @@ SERVICE_TOGGLE = "toggle"
 
 # Events
 EVENT_FINISH = "finish"
+EVENT_FLOW_ALERT = "flow_alert"
 EVENT_INCOMPLETE = "incomplete"
 EVENT_START = "start"
 EVENT_SWITCH_ERROR = "switch_error"
@@ -215,6 +229,10 @@ ATTR_FLOW_RATE = "flow_rate"
 ATTR_ID = "id"
 ATTR_INDEX = "index"
 ATTR_IU_ID = "iu_id"
+ATTR_LAST_24H_TOTAL = "last_24h_total"
+ATTR_LAST_24H_VOLUME = "last_24h_volume"
+ATTR_LAST_7D_TOTAL = "last_7d_total"
+ATTR_LAST_7D_VOLUME = "last_7d_volume"
 ATTR_NAME = "name"
 ATTR_NEXT_ADJUSTMENT = "next_adjustment"
 ATTR_NEXT_DURATION = "next_duration"
@@ -1,8 +1,11 @@
 """History access and caching. This module runs asynchronously collecting
 and caching history data"""
 
-from datetime import datetime, timedelta
-from typing import Callable, OrderedDict, NamedTuple, TypedDict
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from math import isnan, nan
+from typing import Callable, Iterable, OrderedDict, NamedTuple, TypedDict
 from homeassistant.core import HomeAssistant, State, CALLBACK_TYPE
 from homeassistant.util import dt
 
@@ -14,10 +17,11 @@ from homeassistant.components.recorder import get_instance
 from homeassistant.helpers.event import (
     async_track_point_in_utc_time,
 )
+from homeassistant.helpers.storage import Store
 from homeassistant.components.recorder import history
-from homeassistant.const import STATE_ON
+from homeassistant.const import STATE_OFF, STATE_ON
 
-from .util import is_none, TD_ZERO
+from .util import TD_ZERO
 from .const import (
     ATTR_CURRENT_ADJUSTMENT,
     ATTR_CURRENT_NAME,
@@ -29,6 +33,7 @@ from .const import (
     CONF_HISTORY,
     CONF_HISTORY_REFRESH,
     CONF_HISTORY_SPAN,
+    CONF_LIVE,
     CONF_READ_DELAY,
     CONF_REFRESH_INTERVAL,
     CONF_SPAN,
@@ -62,15 +67,264 @@ class IUZoneTimeline(TypedDict):
     flow_rate: float
 
 
+class IUHistoryState(NamedTuple):
+    """Class to hold a recorder state cut down to the attributes the
+    cache uses"""
+
+    state: str
+    attributes: dict
+    last_changed: datetime
+
+
 TODAY_ON = "today_on"
 TIMELINE = "timeline"
+LAST_24H = "last_24h"
+LAST_7D = "last_7d"
+
+
+class IUTagTable:
+    """Interned table of the schedule details shared by the timelines"""
+
+    def __init__(self) -> None:
+        self._index: dict[tuple, int] = {}
+        self._items: list[tuple] = []
+
+    def __getitem__(self, index: int) -> tuple:
+        return self._items[index]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def intern(self, item: tuple) -> int:
+        """Return the index of the item, adding it if required"""
+        if (index := self._index.get(item)) is None:
+            index = self._index[item] = len(self._items)
+            self._items.append(item)
+        return index
+
+    def clear(self) -> None:
+        """Empty the table"""
+        self._index.clear()
+        self._items.clear()
+
+
+class IUTimeline:
+    """Columnar store for the timeline of an entity. Runs are held in
+    parallel arrays and dicts are only built when asked for. Running sums
+    of the on time and volume make totals a lookup"""
+
+    # pylint: disable=too-many-instance-attributes
+
+    VOLUME_DIGITS = 9
+
+    def __init__(self, tags: IUTagTable) -> None:
+        self._tags = tags
+        self._start = array("q")
+        self._end = array("q")
+        self._volume = array("d")
+        self._flow_rate = array("d")
+        self._tag = array("L")
+        self._version = 0
+        # Running sums, one longer than the columns
+        self._on_sum = array("d", [0.0])
+        self._volume_sum = array("d", [0.0])
+        self._volume_count = array("L", [0])
+
+    def __len__(self) -> int:
+        return len(self._start)
+
+    def __eq__(self, other) -> bool:
+        # Compare bytes so missing (nan) values match
+        return isinstance(other, IUTimeline) and all(
+            mine.tobytes() == theirs.tobytes()
+            for mine, theirs in zip(self._columns(), other._columns())
+        )
+
+    __hash__ = None
+
+    @property
+    def version(self) -> int:
+        """Return the change counter"""
+        return self._version
+
+    def _columns(self) -> tuple[array, ...]:
+        return (self._start, self._end, self._volume, self._flow_rate, self._tag)
+
+    @staticmethod
+    def _to_float(value) -> float:
+        return nan if value is None else float(value)
+
+    @staticmethod
+    def _from_float(value: float) -> float | None:
+        return None if isnan(value) else value
+
+    def append(self, record: IUZoneTimeline, elapsed: timedelta = None) -> None:
+        """Add a run to the end of the timeline. elapsed is the unrounded
+        on time of the run"""
+        if elapsed is None:
+            elapsed = record[TIMELINE_END] - record[TIMELINE_START]
+        self._add_sums(elapsed.total_seconds(), record[TIMELINE_VOLUME])
+        self._version += 1
+        self._start.append(int(record[TIMELINE_START].timestamp()))
+        self._end.append(int(record[TIMELINE_END].timestamp()))
+        self._volume.append(self._to_float(record[TIMELINE_VOLUME]))
+        self._flow_rate.append(self._to_float(record[TIMELINE_FLOW_RATE]))
+        self._tag.append(
+            self._tags.intern(
+                (
+                    record[TIMELINE_SCHEDULE],
+                    record[TIMELINE_SCHEDULE_NAME],
+                    record[TIMELINE_ADJUSTMENT],
+                )
+            )
+        )
+
+    def _add_sums(self, seconds: float, volume: float | None) -> None:
+        """Extend the running sums by one run"""
+        self._on_sum.append(self._on_sum[-1] + seconds)
+        if volume is not None:
+            self._volume_sum.append(self._volume_sum[-1] + float(volume))
+            self._volume_count.append(self._volume_count[-1] + 1)
+        else:
+            self._volume_sum.append(self._volume_sum[-1])
+            self._volume_count.append(self._volume_count[-1])
+
+    def snapshot(self) -> dict:
+        """Return the columns as plain lists for saving"""
+        return {
+            "start": self._start.tolist(),
+            "end": self._end.tolist(),
+            "volume": [self._from_float(v) for v in self._volume],
+            "flow_rate": [self._from_float(v) for v in self._flow_rate],
+            "tag": self._tag.tolist(),
+            "on_time": [b - a for a, b in zip(self._on_sum, self._on_sum[1:])],
+        }
+
+    def restore(self, data: dict, tags: list[int]) -> None:
+        """Append the runs from a snapshot. tags maps the saved tag numbers
+        to this table"""
+        self._start.extend(data["start"])
+        self._end.extend(data["end"])
+        self._volume.extend(self._to_float(v) for v in data["volume"])
+        self._flow_rate.extend(self._to_float(v) for v in data["flow_rate"])
+        self._tag.extend(tags[t] for t in data["tag"])
+        for seconds, volume in zip(data["on_time"], data["volume"]):
+            self._add_sums(seconds, volume)
+        self._version += 1
+
+    def trim(self, before: datetime) -> int:
+        """Drop the leading runs that finished before the time. Return
+        the number of runs removed"""
+        limit = before.timestamp()
+        count = 0
+        while count < len(self._end) and self._end[count] < limit:
+            count += 1
+        if count > 0:
+            for column in self._columns():
+                del column[:count]
+            del self._on_sum[:count]
+            del self._volume_sum[:count]
+            del self._volume_count[:count]
+            self._version += 1
+        return count
+
+    def total(self, start: datetime, end: datetime = None) -> IUTodayTotal:
+        """Return the on time and volume of the runs that started in the
+        window"""
+        first = bisect_left(self._start, start.timestamp())
+        if end is None:
+            last = len(self._start)
+        else:
+            last = bisect_left(self._start, end.timestamp(), first)
+        if last <= first:
+            return IUTodayTotal(TD_ZERO, None)
+        volume: float = None
+        if self._volume_count[last] > self._volume_count[first]:
+            volume = round(
+                self._volume_sum[last] - self._volume_sum[first], self.VOLUME_DIGITS
+            )
+        return IUTodayTotal(
+            timedelta(seconds=self._on_sum[last] - self._on_sum[first]), volume
+        )
+
+    def item(self, index: int) -> IUZoneTimeline:
+        """Build the dict for a single run"""
+        schedule, schedule_name, adjustment = self._tags[self._tag[index]]
+        result: IUZoneTimeline = {
+            TIMELINE_START: datetime.fromtimestamp(self._start[index], timezone.utc),
+            TIMELINE_END: datetime.fromtimestamp(self._end[index], timezone.utc),
+            TIMELINE_SCHEDULE: schedule,
+            TIMELINE_SCHEDULE_NAME: schedule_name,
+            TIMELINE_ADJUSTMENT: adjustment,
+            TIMELINE_VOLUME: self._from_float(self._volume[index]),
+            TIMELINE_FLOW_RATE: self._from_float(self._flow_rate[index]),
+        }
+        return result
+
+    def as_list(self) -> list[IUZoneTimeline]:
+        """Build the dicts for the whole timeline"""
+        return [self.item(i) for i in range(len(self._start))]
 
 
 class IUZoneHistory(TypedDict):
     """History cache"""
 
     today_on: IUTodayTotal
-    timeline: IUZoneTimeline
+    last_24h: IUTodayTotal
+    last_7d: IUTodayTotal
+    timeline: IUTimeline
+
+
+class IUHistoryCursor:
+    """Class to hold the incremental read position of an entity. Keeps
+    the pending on state so runs can span successive reads"""
+
+    FRONT_ATTRIBUTES = (
+        ATTR_CURRENT_SCHEDULE,
+        ATTR_CURRENT_NAME,
+        ATTR_CURRENT_ADJUSTMENT,
+    )
+
+    def __init__(self, tags: IUTagTable) -> None:
+        self.last_changed: datetime = None
+        self.front: IUHistoryState = None
+        self.timeline = IUTimeline(tags)
+        self.reported: int = None
+
+    def snapshot(self) -> dict:
+        """Return the cursor as plain data for saving"""
+        front: dict = None
+        if self.front is not None:
+            front = {
+                "last_changed": self.front.last_changed.isoformat(),
+                "attributes": {
+                    k: v
+                    for k, v in self.front.attributes.items()
+                    if k in self.FRONT_ATTRIBUTES
+                },
+            }
+        return {
+            "last_changed": (
+                self.last_changed.isoformat() if self.last_changed else None
+            ),
+            "front": front,
+            "timeline": self.timeline.snapshot(),
+        }
+
+    def restore(self, data: dict, tags: list[int]) -> None:
+        """Load the cursor from a snapshot"""
+        if data["last_changed"] is not None:
+            self.last_changed = dt.parse_datetime(data["last_changed"])
+        if (front := data["front"]) is not None:
+            self.front = IUHistoryState(
+                STATE_ON,
+                front["attributes"],
+                dt.parse_datetime(front["last_changed"]),
+            )
+        self.timeline.restore(data["timeline"], tags)
 
 
 def midnight(utc: datetime) -> datetime:
@@ -95,6 +349,19 @@ class IUHistory:
 
     # pylint: disable=too-many-instance-attributes
 
+    DELTA_OVERLAP = timedelta(seconds=30)
+    STORAGE_KEY = f"{DOMAIN}.history"
+    STORAGE_VERSION = 1
+    SAVE_DELAY = 60
+    READ_CHUNK = timedelta(days=1)
+    PROJECTION = (
+        ATTR_CURRENT_SCHEDULE,
+        ATTR_CURRENT_NAME,
+        ATTR_CURRENT_ADJUSTMENT,
+        ATTR_VOLUME,
+        ATTR_FLOW_RATE,
+    )
+
     def __init__(self, hass: HomeAssistant, callback: Callable[[set[str]], None]):
         self._hass = hass
         self._callback = callback
@@ -103,9 +370,18 @@ class IUHistory:
         self._refresh_interval = timedelta(seconds=120)
         self._enabled = True
         self._read_delay = TD_ZERO
+        self._live = False
         # Private variables
         self._history_last: datetime = None
         self._cache: dict[str, IUZoneHistory] = {}
+        self._cursors: dict[str, IUHistoryCursor] = {}
+        self._tags = IUTagTable()
+        self._fetched: datetime = None
+        self._fetched_day: int = None
+        self._store = Store(hass, self.STORAGE_VERSION, self.STORAGE_KEY)
+        self._restored = False
+        self._watched: set[str] = set()
+        self._changes: dict[str, datetime] = {}
         self._entity_ids: list[str] = []
         self._refresh_remove: CALLBACK_TYPE = None
         self._stime: datetime = None
@@ -142,6 +418,9 @@ class IUHistory:
         # pylint: disable=unused-argument
         self._refresh_remove = None
         self._schedule_refresh(False)  # Perpetual worker
+        if self._live and self._fetched is not None:
+            self._refresh_cache(self._stime, self._cursors)
+            return
         await self._async_update_history(self._stime)
 
     def _initialise(self) -> bool:
@@ -154,6 +433,8 @@ class IUHistory:
         self._stime = None
         self._clear_cache()
         self._entity_ids.clear()
+        self._watched.clear()
+        self._changes.clear()
         for entity_id in self._hass.states.async_entity_ids():
             if entity_id.startswith(f"{BINARY_SENSOR}.{DOMAIN}_"):
                 self._entity_ids.append(entity_id)
@@ -166,111 +447,271 @@ class IUHistory:
 
     def _clear_cache(self) -> None:
         self._cache = {}
+        self._clear_cursors()
+        self._tags.clear()
+
+    def _clear_cursors(self) -> None:
+        """Force a full read on the next update"""
+        self._cursors = {}
+        self._fetched = None
+        self._fetched_day = None
+
+    def _snapshot(self) -> dict | None:
+        """Return the cursors as plain data for saving. Nothing is saved
+        if the cursors were cleared while the save was pending"""
+        if self._fetched is None:
+            return None
+        return {
+            "fetched": self._fetched.isoformat(),
+            "span": self._history_span.total_seconds(),
+            "entity_ids": self._entity_ids,
+            "tags": [list(tag) for tag in self._tags],
+            "cursors": {
+                entity_id: cursor.snapshot()
+                for entity_id, cursor in self._cursors.items()
+            },
+        }
+
+    def _restore(self, data: dict) -> bool:
+        """Load the cursors from a saved snapshot. The snapshot must cover
+        the same span and entities. Changes made while down are unknown so
+        the first delta reads every entity"""
+        if (
+            not data
+            or data["span"] != self._history_span.total_seconds()
+            or not set(self._entity_ids).issubset(data["entity_ids"])
+        ):
+            return False
+        tags = [self._tags.intern(tuple(tag)) for tag in data["tags"]]
+        for entity_id, item in data["cursors"].items():
+            cursor = self._cursors[entity_id] = IUHistoryCursor(self._tags)
+            cursor.restore(item, tags)
+        self._fetched = dt.parse_datetime(data["fetched"])
+        self._fetched_day = dt.as_local(self._fetched).toordinal()
+        self._changes.update(dict.fromkeys(self._entity_ids, self._fetched))
+        return True
 
-    def _today_total(self, stime: datetime, data: list[State]) -> IUTodayTotal:
-        """Return the total on time and volume"""
-        elapsed = TD_ZERO
-        volume: float = None
-        front_marker: State = None
-        start = midnight(stime)
+    @classmethod
+    def _project(cls, state: State) -> IUHistoryState:
+        """Cut a recorder state down to what the cache uses"""
+        return IUHistoryState(
+            state.state,
+            {k: v for k, v in state.attributes.items() if k in cls.PROJECTION},
+            state.last_changed,
+        )
 
+    def _read_chunk(
+        self,
+        entity_ids: list[str],
+        start: datetime,
+        end: datetime,
+        include_start: bool,
+    ) -> dict[str, list[IUHistoryState]]:
+        """Read a single chunk from the recorder and return the projected
+        states. Runs in the recorder executor"""
+        data = history.get_significant_states(
+            self._hass,
+            start,
+            end,
+            entity_ids,
+            None,
+            include_start,
+            False,
+        )
+        return {
+            entity_id: list(map(self._project, states))
+            for entity_id, states in (data or {}).items()
+        }
+
+    async def _async_read_states(
+        self,
+        cursors: dict[str, IUHistoryCursor],
+        entity_ids: list[str],
+        start: datetime,
+        end: datetime,
+        full: bool,
+    ) -> bool:
+        """Read the recorder one chunk at a time. Each chunk is folded into
+        the cursors before the next is read so only one is held at once.
+        Return True if any states were read"""
+        result = False
+        include_start = full
+        query = start
+        while True:
+            stop = min(start + self.READ_CHUNK, end)
+            data = await get_instance(self._hass).async_add_executor_job(
+                self._read_chunk, entity_ids, query, stop, include_start
+            )
+            for entity_id, states in data.items():
+                if (cursor := cursors.get(entity_id)) is None:
+                    cursor = cursors[entity_id] = IUHistoryCursor(self._tags)
+                self._advance(cursor, states)
+                result = True
+            del data
+            if stop >= end:
+                return result
+            include_start = False
+            start = stop
+            query = stop - self.DELTA_OVERLAP
+
+    def _advance(
+        self, cursor: IUHistoryCursor, data: list[IUHistoryState]
+    ) -> None:
+        """Fold newly read states into the cursor. States already seen are
+        skipped"""
         for item in data:
-            # Filter data
-            if item.last_changed < start:
+            if cursor.last_changed is not None and (
+                item.last_changed <= cursor.last_changed
+            ):
                 continue
-            if item.last_changed > stime:
-                break
+            cursor.last_changed = item.last_changed
 
             # Look for an on state
-            if front_marker is None:
+            if cursor.front is None:
                 if item.state == STATE_ON:
-                    front_marker = item
+                    cursor.front = item
                 continue
 
             # Now look for an off state
             if item.state != STATE_ON:
-                elapsed += item.last_changed - front_marker.last_changed
-                if (v := item.attributes.get(ATTR_VOLUME, None)) is not None:
-                    volume = is_none(volume, 0) + v
-                front_marker = None
-
-        if front_marker is not None:
-            elapsed += stime - front_marker.last_changed
-
+                cursor.timeline.append(
+                    self._create_record(cursor.front, item),
+                    item.last_changed - cursor.front.last_changed,
+                )
+                cursor.front = None
+
+    @staticmethod
+    def _create_record(
+        head: IUHistoryState, tail: IUHistoryState
+    ) -> IUZoneTimeline:
+        """Return a timeline record for an on/off pair"""
+        result: IUZoneTimeline = {
+            TIMELINE_START: round_seconds_dt(head.last_changed),
+            TIMELINE_END: round_seconds_dt(tail.last_changed),
+            TIMELINE_SCHEDULE: head.attributes.get(ATTR_CURRENT_SCHEDULE),
+            TIMELINE_SCHEDULE_NAME: head.attributes.get(ATTR_CURRENT_NAME),
+            TIMELINE_ADJUSTMENT: head.attributes.get(ATTR_CURRENT_ADJUSTMENT, ""),
+            TIMELINE_VOLUME: tail.attributes.get(ATTR_VOLUME),
+            TIMELINE_FLOW_RATE: tail.attributes.get(ATTR_FLOW_RATE),
+        }
+        return result
+
+    @staticmethod
+    def _cursor_total(
+        cursor: IUHistoryCursor, stime: datetime, start: datetime
+    ) -> IUTodayTotal:
+        """Return the total on time and volume of the runs that started
+        after start including any run still in progress"""
+        elapsed, volume = cursor.timeline.total(start)
+        if cursor.front is not None and cursor.front.last_changed >= start:
+            elapsed += stime - cursor.front.last_changed
         return IUTodayTotal(timedelta(seconds=round(elapsed.total_seconds())), volume)
 
-    def _run_history(self, stime: datetime, data: list[State]) -> list[IUZoneTimeline]:
-        """Return the on/off series"""
-        # pylint: disable=unused-argument
-
-        def create_record(head: State, tail: State) -> IUZoneTimeline:
-            result: IUZoneTimeline = {
-                TIMELINE_START: round_seconds_dt(head.last_changed),
-                TIMELINE_END: round_seconds_dt(tail.last_changed),
-                TIMELINE_SCHEDULE: head.attributes.get(ATTR_CURRENT_SCHEDULE),
-                TIMELINE_SCHEDULE_NAME: head.attributes.get(ATTR_CURRENT_NAME),
-                TIMELINE_ADJUSTMENT: head.attributes.get(ATTR_CURRENT_ADJUSTMENT, ""),
-                TIMELINE_VOLUME: tail.attributes.get(ATTR_VOLUME),
-                TIMELINE_FLOW_RATE: tail.attributes.get(ATTR_FLOW_RATE),
-            }
-            return result
-
-        run_history: list[IUZoneTimeline] = []
-        front_marker: State = None
-
-        for item in data:
-            # Look for an on state
-            if front_marker is None:
-                if item.state == STATE_ON:
-                    front_marker = item
-                continue
-
-            # Now look for an off state
-            if item.state != STATE_ON:
-                run_history.append(create_record(front_marker, item))
-                front_marker = None
-
-        return run_history
-
     async def _async_update_history(self, stime: datetime) -> None:
+        """Read the recorder and refresh the cache. A full read is done
+        after a reload and at midnight, otherwise only the states since the
+        last read (or the startup snapshot) are requested"""
         if len(self._entity_ids) == 0:
             return
 
-        start = self._stime - self._history_span
-        if DATA_INSTANCE in self._hass.data:
-            data = await get_instance(self._hass).async_add_executor_job(
-                history.get_significant_states,
-                self._hass,
-                start,
-                stime,
-                self._entity_ids,
-                None,
-                True,
-                False,
+        # At startup pick up from the last snapshot
+        if self._fetched is None and not self._restored:
+            self._restored = True
+            self._restore(await self._store.async_load())
+
+        full = (
+            self._fetched is None
+            or stime < self._fetched
+            or self._fetched_day != dt.as_local(stime).toordinal()
+        )
+        if full:
+            start = self._stime - self._history_span
+            entity_ids = self._entity_ids
+        else:
+            start = self._fetched - self.DELTA_OVERLAP
+            entity_ids = self._changed_entities(start)
+        # A full read starts the cursors afresh
+        cursors = {} if full else self._cursors
+        if DATA_INSTANCE in self._hass.data and len(entity_ids) > 0:
+            found = await self._async_read_states(
+                cursors, entity_ids, start, stime, full
             )
         else:
-            data = {}
+            found = False
 
-        if data is None or len(data) == 0:
+        if full and not found and not self._live:
             return
-
+        if not full and cursors is not self._cursors:
+            return  # Cleared while reading, the next update starts afresh
+
+        if full:
+            self._cursors = cursors
+            self._fetched_day = dt.as_local(stime).toordinal()
+        self._fetched = stime
+        self._refresh_cache(stime, self._cursors)
+
+    def _changed_entities(self, start: datetime) -> list[str]:
+        """Return the entities to read from start. Watched entities are
+        skipped unless they have turned on or off since then"""
+        for entity_id in [k for k, v in self._changes.items() if v < start]:
+            del self._changes[entity_id]
+        return [
+            entity_id
+            for entity_id in self._entity_ids
+            if entity_id not in self._watched or entity_id in self._changes
+        ]
+
+    def _refresh_cache(
+        self, stime: datetime, cursors: dict[str, IUHistoryCursor]
+    ) -> None:
+        """Trim and total up the cursors. Update the cache and notify the
+        entities that have changed"""
+        today = midnight(stime)
+        window = self._stime - self._history_span
+        # Nothing older than the span is read so the totals stop there
+        last_24h = stime - min(timedelta(days=1), self._history_span)
+        last_7d = stime - min(timedelta(days=7), self._history_span)
         entity_ids: set[str] = set()
-        for entity_id in data:
-            new_run_history = self._run_history(stime, data[entity_id])
-            new_today_on = self._today_total(stime, data[entity_id])
+        for entity_id, cursor in cursors.items():
+            cursor.timeline.trim(window)
+            totals = {
+                TODAY_ON: self._cursor_total(cursor, stime, today),
+                LAST_24H: self._cursor_total(cursor, stime, last_24h),
+                LAST_7D: self._cursor_total(cursor, stime, last_7d),
+            }
+            reported = cursor.reported
+            cursor.reported = cursor.timeline.version
             if entity_id not in self._cache:
                 self._cache[entity_id] = {}
-            elif (
-                new_today_on == self._cache[entity_id][TODAY_ON]
-                and new_run_history == self._cache[entity_id][TIMELINE]
+            elif all(self._cache[entity_id][k] == v for k, v in totals.items()) and (
+                reported == cursor.timeline.version
+                if self._cache[entity_id][TIMELINE] is cursor.timeline
+                else self._cache[entity_id][TIMELINE] == cursor.timeline
             ):
+                self._cache[entity_id][TIMELINE] = cursor.timeline
                 continue
-            self._cache[entity_id][TIMELINE] = new_run_history
-            self._cache[entity_id][TODAY_ON] = new_today_on
+            self._cache[entity_id][TIMELINE] = cursor.timeline
+            self._cache[entity_id].update(totals)
             entity_ids.add(entity_id)
         if len(entity_ids) > 0:
+            self._store.async_delay_save(self._snapshot, self.SAVE_DELAY)
             self._callback(entity_ids)
 
+    def record(
+        self, entity_id: str, stime: datetime, is_on: bool, attributes: dict
+    ) -> None:
+        """Note an on/off change of a watched entity. When live and the cache
+        has been seeded it is fed straight into the cache"""
+        self._changes[entity_id] = stime
+        if not (self._enabled and self._live) or self._fetched is None:
+            return
+        if (cursor := self._cursors.get(entity_id)) is None:
+            cursor = self._cursors[entity_id] = IUHistoryCursor(self._tags)
+        state = IUHistoryState(STATE_ON if is_on else STATE_OFF, attributes, stime)
+        self._advance(cursor, [state])
+        self._fetched = max(self._fetched, stime)
+        self._refresh_cache(stime, {entity_id: cursor})
+
     def load(self, config: OrderedDict, fixed_clock: bool) -> "IUHistory":
         """Load config data"""
         if config is None:
@@ -291,6 +732,7 @@ class IUHistory:
             refresh_seconds = hist_conf.get(CONF_REFRESH_INTERVAL, refresh_seconds)
             if (read_delay := hist_conf.get(CONF_READ_DELAY)) is not None:
                 self._read_delay = timedelta(seconds=read_delay)
+            self._live = hist_conf.get(CONF_LIVE, self._live)
 
         if span_days is not None:
             self._history_span = timedelta(days=span_days)
@@ -300,14 +742,26 @@ class IUHistory:
         self._initialised = False
         return self
 
-    def muster(self, stime: datetime, force: bool) -> None:
-        """Check and update history if required"""
+    @property
+    def live(self) -> bool:
+        """Indicate if the cache is fed directly from state changes"""
+        return self._enabled and self._live
+
+    def watch(self, entity_ids: Iterable[str]) -> None:
+        """Register the entities that report their on/off changes. These
+        are only read from the recorder after they have changed"""
+        self._watched.update(e for e in entity_ids if e is not None)
+
+    def muster(self, stime: datetime, force: bool) -> bool:
+        """Check and update history if required. Return True if the unit
+        was initialised"""
+        result = False
 
         if force:
             self._initialised = False
 
         if not self._initialised:
-            self._initialise()
+            result = self._initialise()
 
         if self._enabled and (
             force
@@ -318,6 +772,7 @@ class IUHistory:
             self._schedule_refresh(True)
 
         self._stime = stime
+        return result
 
     def today_total_duration(self, entity_id: str) -> timedelta:
         """Return the total on time for today"""
@@ -331,8 +786,21 @@ class IUHistory:
             return self._cache[entity_id][TODAY_ON].volume
         return None
 
+    def last_24h_total(self, entity_id: str) -> IUTodayTotal:
+        """Return the on time and volume for the last 24 hours"""
+        if entity_id in self._cache:
+            return self._cache[entity_id][LAST_24H]
+        return IUTodayTotal(TD_ZERO, None)
+
+    def last_7d_total(self, entity_id: str) -> IUTodayTotal:
+        """Return the on time and volume for the last 7 days or the history
+        span if that is shorter"""
+        if entity_id in self._cache:
+            return self._cache[entity_id][LAST_7D]
+        return IUTodayTotal(TD_ZERO, None)
+
     def timeline(self, entity_id: str) -> list[dict]:
         """Return the timeline history"""
         if entity_id in self._cache:
-            return self._cache[entity_id][TIMELINE].copy()
+            return self._cache[entity_id][TIMELINE].as_list()
         return []
@@ -1,7 +1,12 @@
 """Irrigation Unlimited Coordinator and sub classes"""
 
 # pylint: disable=too-many-lines
+import asyncio
+import math
 import weakref
+from bisect import bisect_left
+from heapq import heapify, heappop, heappush
+from operator import attrgetter
 from datetime import datetime, time, timedelta, timezone, date
 from collections import deque
 from collections.abc import Iterator
@@ -18,6 +23,7 @@ from homeassistant.core import (
     HomeAssistant,
     HassJob,
     CALLBACK_TYPE,
+    callback,
     DOMAIN as HADOMAIN,
     Event as HAEvent,
     split_entity_id,
@@ -30,23 +36,29 @@ from homeassistant.helpers.event import (
     async_track_state_change_event,
 )
 from homeassistant.helpers import sun
+from homeassistant.helpers import entity_registry as er
 from homeassistant.util import dt
 from homeassistant.helpers import config_validation as cv
 
 from homeassistant.const import (
     ATTR_ENTITY_ID,
     ATTR_ICON,
+    ATTR_UNIT_OF_MEASUREMENT,
     CONF_AFTER,
     CONF_BEFORE,
     CONF_DELAY,
+    CONF_ELEVATION,
     CONF_ENTITY_ID,
     CONF_FOR,
     CONF_ICON,
+    CONF_LATITUDE,
+    CONF_LONGITUDE,
     CONF_NAME,
     CONF_REPEAT,
     CONF_STATE,
     CONF_UNTIL,
     CONF_WEEKDAY,
+    EVENT_CORE_CONFIG_UPDATE,
     EVENT_HOMEASSISTANT_STOP,
     SERVICE_CLOSE_COVER,
     SERVICE_CLOSE_VALVE,
@@ -63,14 +75,18 @@ from homeassistant.const import (
 )
 
 from .util import is_none, TD_ZERO
-from .history import IUHistory
+from .history import IUHistory, IUTodayTotal
+from .lts import IUStatistics
 from .const import (
     ATTR_ADJUSTED_DURATION,
     ATTR_ADJUSTMENT,
     ATTR_BASE_DURATION,
     ATTR_CONTROLLER,
     ATTR_CONTROLLER_ID,
+    ATTR_CURRENT_ADJUSTMENT,
     ATTR_CURRENT_DURATION,
+    ATTR_CURRENT_NAME,
+    ATTR_CURRENT_SCHEDULE,
     ATTR_DEFAULT_DELAY,
     ATTR_DEFAULT_DURATION,
     ATTR_DURATION,
@@ -107,6 +123,8 @@ from .const import (
     CONF_AUTOPLAY,
     CONF_CHECK_BACK,
     CONF_CLOCK,
+    CONF_COMMAND_QUEUE,
+    CONF_CONCURRENCY,
     CONF_CONFIG,
     CONF_CONTROLLER,
     CONF_CONTROLLERS,
@@ -125,8 +143,11 @@ from .const import (
     CONF_EXTENDED_CONFIG,
     CONF_FINISH,
     CONF_FIXED,
+    CONF_FLOW_ACTION,
     CONF_FLOW_RATE_PRECISION,
     CONF_FLOW_RATE_SCALE,
+    CONF_FLOW_RATE_WINDOW,
+    CONF_FLOW_TOLERANCE,
     CONF_FOUND,
     CONF_FROM,
     CONF_FUTURE_SPAN,
@@ -135,12 +156,16 @@ from .const import (
     CONF_GRANULARITY,
     CONF_INCREASE,
     CONF_INDEX,
+    CONF_INTEGRATIONS,
     CONF_LOGGING,
+    CONF_LOG_SUMMARY,
     CONF_MAXIMUM,
     CONF_MAX_LOG_ENTRIES,
     CONF_MINIMUM,
     CONF_MODE,
     CONF_MONTH,
+    CONF_NOTIFY,
+    CONF_NOTIFY_INTERVAL,
     CONF_ODD,
     CONF_OUTPUT_EVENTS,
     CONF_PAUSE_NEXT,
@@ -165,12 +190,14 @@ from .const import (
     CONF_SHOW_CONFIG,
     CONF_SHOW_LOG,
     CONF_SHOW_SEQUENCE_STATUS,
+    CONF_SPACING,
     CONF_SPEED,
     CONF_START,
     CONF_START_N_DAYS,
     CONF_STATES,
     CONF_SUN,
     CONF_SYNC_SWITCHES,
+    CONF_TARGET,
     CONF_TESTING,
     CONF_THRESHOLD,
     CONF_TIME,
@@ -192,6 +219,7 @@ from .const import (
     DEFAULT_TEST_SPEED,
     DOMAIN,
     EVENT_FINISH,
+    EVENT_FLOW_ALERT,
     EVENT_START,
     EVENT_SWITCH_ERROR,
     EVENT_SYNC_ERROR,
@@ -263,6 +291,16 @@ def to_secs(atime: timedelta) -> int:
     return round(atime.total_seconds())
 
 
+def dt2epoch(stime: datetime) -> int:
+    """Convert the supplied datetime to whole epoch seconds"""
+    return int(stime.timestamp())
+
+
+def epoch2dt(secs: int) -> datetime:
+    """Convert whole epoch seconds to a UTC datetime"""
+    return datetime.fromtimestamp(secs, timezone.utc)
+
+
 # These routines truncate dates, times and deltas to the internal
 # granularity. This should be no more than 1 minute and realistically
 # no less than 1 second i.e. 1 >= GRANULARITY <= 60
@@ -407,6 +445,74 @@ class IUDTMin:
         return self
 
 
+class IUDeadlines:
+    """Irrigation Unlimited wake up register. Each object lodges its next
+    deadline here when it changes. The earliest deadline is kept at the head
+    of a priority queue so the clock does not need to walk the object tree.
+    Superseded entries are discarded lazily as they surface"""
+
+    COMPACT_RATIO: int = 4
+
+    def __init__(self) -> None:
+        # Private variables
+        self._deadlines: dict[object, datetime] = {}
+        self._heap: list[tuple[datetime, int, object]] = []
+        self._sequence: int = 0
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def set(self, owner: object, deadline: datetime | None) -> None:
+        """Register the next deadline for the owner. A value of None
+        or the end of time cancels any outstanding deadline"""
+        if deadline is None or deadline == IUDTMin.eot:
+            self.cancel(owner)
+            return
+        if self._deadlines.get(owner) == deadline:
+            return
+        self._deadlines[owner] = deadline
+        self._sequence += 1
+        heappush(self._heap, (deadline, self._sequence, owner))
+        if len(self._heap) > self.COMPACT_RATIO * (len(self._deadlines) + 1):
+            self._compact()
+
+    def cancel(self, owner: object) -> None:
+        """Remove the deadline for the owner"""
+        self._deadlines.pop(owner, None)
+
+    def pop_due(self, stime: datetime) -> list[object]:
+        """Remove and return the owners with a deadline at or before stime"""
+        result: list[object] = []
+        while self._heap and self._heap[0][0] <= stime:
+            deadline, _, owner = heappop(self._heap)
+            if self._deadlines.get(owner) == deadline:
+                del self._deadlines[owner]
+                result.append(owner)
+        return result
+
+    def clear(self) -> None:
+        """Remove all deadlines"""
+        self._deadlines.clear()
+        self._heap.clear()
+
+    def _compact(self) -> None:
+        """Rebuild the queue from the live deadlines"""
+        self._heap = [
+            item for item in self._heap if self._deadlines.get(item[2]) == item[0]
+        ]
+        heapify(self._heap)
+
+    @property
+    def min(self) -> datetime:
+        """Return the earliest deadline or the end of time"""
+        while self._heap:
+            deadline, _, owner = self._heap[0]
+            if self._deadlines.get(owner) == deadline:
+                return deadline
+            heappop(self._heap)
+        return IUDTMin.eot
+
+
 class IUJSONEncoder(json.JSONEncoder):
     """JSON serialiser to handle ISO datetime output"""
 
@@ -421,6 +527,8 @@ class IUJSONEncoder(json.JSONEncoder):
 class IUBase:
     """Irrigation Unlimited base class"""
 
+    __slots__ = ("_uid", "_index", "__weakref__")
+
     def __init__(self, index: int) -> None:
         # Private variables
         self._uid: int = uuid.uuid4().int
@@ -630,12 +738,67 @@ class IUUser(dict):
         load_params(config.get(CONF_USER))
 
 
+class IUAstral:
+    """Irrigation Unlimited cache of astral events. Shared by all the
+    schedules and keyed by local date, event and location"""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        # Passed parameters
+        self._hass = hass
+        # Private variables
+        self._cache: dict[tuple[date, str, tuple], datetime | None] = {}
+        self._filled: date = None
+
+    @property
+    def location(self) -> tuple:
+        """Return the current HA location"""
+        config = self._hass.config
+        return (config.latitude, config.longitude, config.elevation, config.time_zone)
+
+    def clear(self) -> None:
+        """Drop all the cached events"""
+        self._cache.clear()
+        self._filled = None
+
+    def refill(self) -> None:
+        """Prefill again at the next muster. The cached events are kept"""
+        self._filled = None
+
+    def is_filled(self, stime: datetime) -> bool:
+        """Return True if the cache has been filled for the day"""
+        return self._filled is not None and dt.as_local(stime).date() == self._filled
+
+    def get(self, event: str, day: date) -> datetime | None:
+        """Return the astral event for the local day"""
+        key = (day, event, self.location)
+        if key in self._cache:
+            return self._cache[key]
+        result = sun.get_astral_event_date(self._hass, event, day)
+        self._cache[key] = result
+        return result
+
+    def prefill(self, stime: datetime, events: set[str], span: timedelta) -> None:
+        """Populate the cache for the look ahead window and purge old days"""
+        today = dt.as_local(stime).date()
+        if today == self._filled:
+            return
+        for key in [key for key in self._cache if key[0] < today]:
+            del self._cache[key]
+        for i in range(span.days + 2):
+            for event in events:
+                self.get(event, today + timedelta(days=i))
+        self._filled = today
+
+
 class IUSchedule(IUBase):
     """Irrigation Unlimited Schedule class. Schedules are not actual
     points in time but describe a future event i.e. next Monday at
     sunrise"""
 
     # pylint: disable=too-many-instance-attributes
+
+    CALENDAR_DAYS: int = 366
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -659,6 +822,10 @@ class IUSchedule(IUBase):
         self._until: date = None
         self._enabled = True
         # Private variables
+        self._calendar: bytearray = None
+        self._calendar_base: int = None
+        self._cron: CronTab = None
+        self._cron_cursor: tuple[datetime, datetime] = None
 
     @property
     def schedule_id(self) -> str:
@@ -680,6 +847,13 @@ class IUSchedule(IUBase):
         """Return the start time of the schedule"""
         return self._start_time
 
+    @property
+    def sun_event(self) -> str | None:
+        """Return the astral event if this schedule is sun based"""
+        if isinstance(self._start_time, dict):
+            return self._start_time.get(CONF_SUN)
+        return None
+
     @property
     def weekdays(self) -> list[int]:
         """Return the week days of the schedule"""
@@ -739,6 +913,17 @@ class IUSchedule(IUBase):
         self._name = config.get(CONF_NAME, self._name)
         self._enabled = config.get(CONF_ENABLED, self._enabled)
 
+        self._cron = None
+        self._cron_cursor = None
+        if isinstance(self._start_time, dict) and CONF_CRON in self._start_time:
+            try:
+                self._cron = CronTab(self._start_time[CONF_CRON])
+            except ValueError as error:
+                self._coordinator.logger.log_invalid_crontab(
+                    None, self, self._start_time[CONF_CRON], error
+                )
+                self._enabled = False  # Shutdown this schedule
+
         if CONF_WEEKDAY in config:
             self._weekdays = []
             for i in config[CONF_WEEKDAY]:
@@ -760,6 +945,8 @@ class IUSchedule(IUBase):
                 }
         self._from = config.get(CONF_FROM, self._from)
         self._until = config.get(CONF_UNTIL, self._until)
+        self._calendar = None
+        self._calendar_base = None
 
         return self
 
@@ -780,6 +967,88 @@ class IUSchedule(IUBase):
             result[CONF_DAY] = self._days
         return result
 
+    def is_active_day(self, day: date) -> bool:
+        """Return True if the day passes the weekday, month, day
+        and from/until filters"""
+        # pylint: disable=too-many-return-statements
+
+        # DOW filter
+        if self._weekdays is not None and day.weekday() not in self._weekdays:
+            return False
+
+        # Month filter
+        if self._months is not None and day.month not in self._months:
+            return False
+
+        # Day filter
+        if self._days is not None:
+            if self._days == CONF_ODD:
+                if day.day % 2 == 0:
+                    return False
+            elif self._days == CONF_EVEN:
+                if day.day % 2 != 0:
+                    return False
+            elif isinstance(self._days, dict) and CONF_EVERY_N_DAYS in self._days:
+                n_days: int = self._days[CONF_EVERY_N_DAYS]
+                start_date: date = self._days[CONF_START_N_DAYS]
+                if (day - start_date).days % n_days != 0:
+                    return False
+            elif day.day not in self._days:
+                return False
+
+        # From/Until filter
+        if self._from is not None and self._until is not None:
+            dts = self._from.replace(year=day.year)
+            dte = self._until.replace(year=day.year)
+            if dte < dts:
+                if day >= dts:
+                    dte = dte.replace(year=dte.year + 1)
+                else:
+                    dts = dts.replace(year=dts.year - 1)
+
+            if not dts <= day <= dte:
+                return False
+
+        return True
+
+    def _compile_calendar(self, ordinal: int) -> None:
+        """Build the bitmap of active days starting at the ordinal"""
+        self._calendar_base = ordinal
+        self._calendar = bytearray(
+            self.is_active_day(date.fromordinal(ordinal + i))
+            for i in range(self.CALENDAR_DAYS)
+        )
+
+    def next_active_day(self, day: date, last: date) -> date | None:
+        """Return the first active day on or after day. Return None
+        if there is nothing on or before last"""
+        ordinal = day.toordinal()
+        last_ordinal = last.toordinal()
+        while ordinal <= last_ordinal:
+            if self._calendar is None or not (
+                0 <= ordinal - self._calendar_base < len(self._calendar)
+            ):
+                self._compile_calendar(ordinal)
+            idx = self._calendar.find(1, ordinal - self._calendar_base)
+            if idx >= 0:
+                ordinal = self._calendar_base + idx
+                if ordinal > last_ordinal:
+                    break
+                return date.fromordinal(ordinal)
+            ordinal = self._calendar_base + len(self._calendar)
+        return None
+
+    def next_cron_event(self, local_time: datetime) -> datetime | None:
+        """Return the next cron event after local_time. The cursor remembers
+        the last request so repeated calls within the same interval are free"""
+        if self._cron_cursor is not None:
+            cursor, event = self._cron_cursor
+            if cursor <= local_time and (event is None or local_time < event):
+                return event
+        event = self._cron.next(now=local_time, return_datetime=True, default_utc=True)
+        self._cron_cursor = (local_time, event)
+        return event
+
     def get_next_run(
         self,
         stime: datetime,
@@ -808,6 +1077,12 @@ class IUSchedule(IUBase):
                 current_time = local_time
             else:
                 current_time += advancement  # Advance to next day
+
+            # Jump to the next day that passes the filters
+            next_day = self.next_active_day(current_time.date(), final_time.date())
+            if next_day is None:
+                return None
+            current_time += timedelta(days=(next_day - current_time.date()).days)
             next_run = current_time
 
             # Sanity check. Note: Astral events like sunrise might be months
@@ -815,59 +1090,14 @@ class IUSchedule(IUBase):
             if next_run > final_time:
                 return None
 
-            # DOW filter
-            if self._weekdays is not None and next_run.weekday() not in self._weekdays:
-                continue
-
-            # Month filter
-            if self._months is not None and next_run.month not in self._months:
-                continue
-
-            # Day filter
-            if self._days is not None:
-                if self._days == CONF_ODD:
-                    if next_run.day % 2 == 0:
-                        continue
-                elif self._days == CONF_EVEN:
-                    if next_run.day % 2 != 0:
-                        continue
-                elif isinstance(self._days, dict) and CONF_EVERY_N_DAYS in self._days:
-                    n_days: int = self._days[CONF_EVERY_N_DAYS]
-                    start_date: date = self._days[CONF_START_N_DAYS]
-                    if (next_run.date() - start_date).days % n_days != 0:
-                        continue
-                elif next_run.day not in self._days:
-                    continue
-
-            # From/Until filter
-            if self._from is not None and self._until is not None:
-                dts = datetime.combine(
-                    self._from.replace(year=next_run.year),
-                    datetime.min.time(),
-                    next_run.tzinfo,
-                )
-                dte = datetime.combine(
-                    self._until.replace(year=next_run.year),
-                    datetime.max.time(),
-                    next_run.tzinfo,
-                )
-                if dte < dts:
-                    if next_run >= dts:
-                        dte = dte.replace(year=dte.year + 1)
-                    else:
-                        dts = dts.replace(year=dts.year - 1)
-
-                if not dts <= next_run <= dte:
-                    continue
-
             # Adjust time component
             if isinstance(self._start_time, time):
                 next_run = datetime.combine(
                     next_run.date(), self._start_time, next_run.tzinfo
                 )
             elif isinstance(self._start_time, dict) and CONF_SUN in self._start_time:
-                sun_event = sun.get_astral_event_date(
-                    self._hass, self._start_time[CONF_SUN], next_run
+                sun_event = self._coordinator.astral.get(
+                    self._start_time[CONF_SUN], next_run.date()
                 )
                 if sun_event is None:
                     continue  # Astral event did not occur today
@@ -878,20 +1108,12 @@ class IUSchedule(IUBase):
                 if CONF_BEFORE in self._start_time:
                     next_run -= self._start_time[CONF_BEFORE]
             elif isinstance(self._start_time, dict) and CONF_CRON in self._start_time:
-                try:
-                    cron = CronTab(self._start_time[CONF_CRON])
-                    cron_event = cron.next(
-                        now=local_time, return_datetime=True, default_utc=True
-                    )
-                    if cron_event is None:
-                        return None
-                    next_run = dt.as_local(cron_event)
-                except ValueError as error:
-                    self._coordinator.logger.log_invalid_crontab(
-                        stime, self, self._start_time[CONF_CRON], error
-                    )
-                    self._enabled = False  # Shutdown this schedule
+                if self._cron is None:
+                    return None  # Invalid expression, reported at load time
+                cron_event = self.next_cron_event(local_time)
+                if cron_event is None:
                     return None
+                next_run = dt.as_local(cron_event)
             else:  # Some weird error happened
                 return None
 
@@ -937,6 +1159,7 @@ class IUSwitch:
         self._state: bool = None  # This parameter should mirror IUZone._is_on
         self._check_back_time: timedelta = None
         self._check_back_resync_count: int = 0
+        self._check_back_wait: float = 0.0
 
     @property
     def switch_entity_id(self) -> list[str] | None:
@@ -958,32 +1181,31 @@ class IUSwitch:
             or (self._switch_entity_states == "off" and not state)
         )
 
-    def _set_switch(self, entity_id: str | list[str], state: bool) -> None:
+    def _set_switch(
+        self, entity_id: str | list[str], state: bool, merge: bool = True
+    ) -> None:
         """Make the HA call to physically turn the switch on/off"""
-
-        def make_call(entity: str) -> None:
-            domain = split_entity_id(entity)[0]
-            match domain:
-                case Platform.VALVE:
-                    service = SERVICE_OPEN_VALVE if state else SERVICE_CLOSE_VALVE
-                case Platform.COVER:
-                    service = SERVICE_OPEN_COVER if state else SERVICE_CLOSE_COVER
-                case _:
-                    domain = HADOMAIN
-                    service = SERVICE_TURN_ON if state else SERVICE_TURN_OFF
-            self._hass.async_create_task(
-                self._hass.services.async_call(
-                    domain,
-                    service,
-                    {ATTR_ENTITY_ID: entity},
-                )
+        self._coordinator.dispatcher.add(entity_id, state, self._dispatched, merge)
+
+    def _dispatched(self, wait: float) -> None:
+        """The switch call has left the command queue. Measure the check
+        back from here rather than when it was queued. The shift is rounded
+        up to the granularity to keep the deadline on the grid"""
+        if self._check_back_time is not None and wait > self._check_back_wait:
+            shift = (
+                math.ceil((wait - self._check_back_wait) / SYSTEM_GRANULARITY)
+                * SYSTEM_GRANULARITY
             )
-
-        if isinstance(entity_id, list):
-            for ent in entity_id:
-                make_call(ent)
+            self._check_back_time += timedelta(seconds=shift)
+            self._check_back_wait += shift
+            self._lodge()
+
+    def _lodge(self) -> None:
+        """The check back has moved. Have the owner lodge a new deadline"""
+        if self._zone is not None:
+            self._zone.lodge()
         else:
-            make_call(entity_id)
+            self._controller.lodge()
 
     def _notify_valve(
         self, reason: int, stime: datetime, entity_id: str | list[str]
@@ -1021,8 +1243,10 @@ class IUSwitch:
             if entities := self.check_switch(atime, self._check_back_resync, True):
                 self._check_back_resync_count += 1
                 self._check_back_time = atime + self._check_back_delay
+                self._check_back_wait = 0.0
             else:
                 self._check_back_time = None
+        self._lodge()
 
     def next_event(self) -> datetime:
         """Return the next time of interest"""
@@ -1100,7 +1324,9 @@ class IUSwitch:
             if self._allow_set(self._state):
                 if self._check_back_toggle:
                     self._set_switch(entity_id, not self._state)
-                self._set_switch(entity_id, self._state)
+                    self._set_switch(entity_id, self._state, False)
+                else:
+                    self._set_switch(entity_id, self._state)
             self._notify_valve(2, stime, entity_id)
 
         if self._switch_entity_id is not None:
@@ -1135,11 +1361,260 @@ class IUSwitch:
             ):
                 self._check_back_resync_count = 0
                 self._check_back_time = stime + self._check_back_delay
+                self._check_back_wait = 0.0
+            self._lodge()
         else:
             self._state = state
         self._notify_valve(1, stime, self._switch_entity_id)
 
 
+class IUSwitchCommand:
+    """Irrigation Unlimited switch command class. A queued call for one
+    entity"""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(
+        self,
+        entity_id: str,
+        state: bool,
+        callback: Callable[[float], None] = None,
+    ) -> None:
+        # Passed parameters
+        self.entity_id = entity_id
+        self.state = state
+        self.callback = callback
+        # Private variables
+        self.queued = tm.perf_counter()
+        self.cancelled = False
+
+
+class IUSwitchQueue:
+    """Irrigation Unlimited switch queue class. Limits the number of calls
+    in flight to an integration and spaces them out"""
+
+    def __init__(self, concurrency: int, spacing: float) -> None:
+        # Passed parameters
+        self._spacing = spacing
+        # Private variables
+        self._semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+        self._next_slot: float = 0.0
+
+    async def acquire(self) -> None:
+        """Wait for a free slot"""
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        if self._spacing:
+            now = tm.perf_counter()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._spacing
+            if slot > now:
+                await asyncio.sleep(slot - now)
+
+    def release(self) -> None:
+        """Free the slot"""
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+class IUSwitchDispatcher:
+    """Irrigation Unlimited switch dispatcher class. Collects the switch
+    calls made in the same pass and sends one call per domain and service.
+    Batches are separated by barriers and each batch waits for the one
+    before it to finish. When a command queue is configured the calls to
+    an integration are sent one entity at a time through its queue"""
+
+    # pylint: disable=too-many-instance-attributes
+
+    CALL_TIMEOUT = 30
+
+    def __init__(self, hass: HomeAssistant, coordinator: "IUCoordinator") -> None:
+        # Passed parameters
+        self._hass = hass
+        self._coordinator = coordinator
+        # Config parameters
+        self._concurrency: int = 0
+        self._spacing: float = 0.0
+        self._integrations: list[str] = None
+        # Private variables
+        self._batches: list[list[IUSwitchCommand]] = [[]]
+        self._entities: set[str] = set()
+        self._pending: dict[str, IUSwitchCommand] = {}
+        self._queues: dict[str, IUSwitchQueue] = {}
+        self._scheduled = False
+        self._lock = asyncio.Lock()
+        self._latency: dict[str, float] = {}
+
+    @property
+    def latency(self) -> dict[str, float]:
+        """Return the duration in seconds of the last call for each
+        domain and service"""
+        return self._latency
+
+    @property
+    def is_limited(self) -> bool:
+        """Return True if a command queue is configured"""
+        return bool(self._concurrency or self._spacing)
+
+    @staticmethod
+    def service(entity_id: str, state: bool) -> tuple[str, str]:
+        """Return the domain and service to set the entity"""
+        domain = split_entity_id(entity_id)[0]
+        match domain:
+            case Platform.VALVE:
+                service = SERVICE_OPEN_VALVE if state else SERVICE_CLOSE_VALVE
+            case Platform.COVER:
+                service = SERVICE_OPEN_COVER if state else SERVICE_CLOSE_COVER
+            case _:
+                domain = HADOMAIN
+                service = SERVICE_TURN_ON if state else SERVICE_TURN_OFF
+        return (domain, service)
+
+    def integration(self, entity_id: str) -> str:
+        """Return the integration providing the entity. Falls back to
+        the domain when the entity is not in the registry"""
+        if (entry := er.async_get(self._hass).async_get(entity_id)) is not None:
+            return entry.platform
+        return split_entity_id(entity_id)[0]
+
+    def _queue(self, entity_id: str) -> IUSwitchQueue | None:
+        """Return the command queue for the entity"""
+        if not self.is_limited:
+            return None
+        integration = self.integration(entity_id)
+        if self._integrations is not None and integration not in self._integrations:
+            return None
+        if (queue := self._queues.get(integration)) is None:
+            queue = self._queues[integration] = IUSwitchQueue(
+                self._concurrency, self._spacing
+            )
+        return queue
+
+    def add(
+        self,
+        entity_id: str | list[str],
+        state: bool,
+        callback: Callable[[float], None] = None,
+        merge: bool = True,
+    ) -> None:
+        """Queue the entities to be switched. When a command queue is
+        configured and merge is set a command still waiting to be sent for
+        the same entity is dropped. The callback is passed the seconds the
+        command spent in a command queue when it is sent"""
+        if isinstance(entity_id, str):
+            entity_id = [entity_id]
+        merge = merge and self.is_limited
+        for entity in entity_id:
+            merged = False
+            if merge and (pending := self._pending.get(entity)) is not None:
+                pending.cancelled = True
+                merged = True
+            if entity in self._entities and not merged:
+                # Keep the order of repeated calls
+                self.barrier()
+            self._entities.add(entity)
+            command = IUSwitchCommand(entity, state, callback)
+            self._pending[entity] = command
+            self._batches[-1].append(command)
+        if not self._scheduled:
+            self._scheduled = True
+            self._hass.async_create_task(self._async_dispatch())
+
+    def barrier(self) -> None:
+        """Close the current batch"""
+        if self._batches[-1]:
+            self._batches.append([])
+            self._entities.clear()
+
+    async def _async_dispatch(self) -> None:
+        """Send out the queued batches. The task starts once the
+        current pass has finished queuing"""
+        batches = [batch for batch in self._batches if batch]
+        self._batches = [[]]
+        self._entities.clear()
+        self._scheduled = False
+        async with self._lock:
+            for batch in batches:
+                groups: dict[tuple[str, str], list[IUSwitchCommand]] = {}
+                calls: list[Awaitable] = []
+                for command in batch:
+                    if command.cancelled:
+                        continue
+                    domain, service = self.service(command.entity_id, command.state)
+                    if (queue := self._queue(command.entity_id)) is not None:
+                        calls.append(
+                            self._async_call(domain, service, [command], queue)
+                        )
+                    else:
+                        groups.setdefault((domain, service), []).append(command)
+                calls.extend(
+                    self._async_call(domain, service, commands)
+                    for (domain, service), commands in groups.items()
+                )
+                await asyncio.gather(*calls)
+
+    def _sent(self, command: IUSwitchCommand) -> None:
+        """Mark the command as no longer pending"""
+        if self._pending.get(command.entity_id) is command:
+            del self._pending[command.entity_id]
+
+    async def _async_call(
+        self,
+        domain: str,
+        service: str,
+        commands: list[IUSwitchCommand],
+        queue: IUSwitchQueue = None,
+    ) -> None:
+        """Make the HA call and time it. A failed or stalled call is logged
+        and does not hold up the others"""
+        if not (commands := [cmd for cmd in commands if not cmd.cancelled]):
+            return
+        if queue is not None:
+            await queue.acquire()
+        try:
+            # Look again, a command may have been merged away while waiting
+            if not (commands := [cmd for cmd in commands if not cmd.cancelled]):
+                return
+            start = tm.perf_counter()
+            entities: list[str] = []
+            for command in commands:
+                self._sent(command)
+                entities.append(command.entity_id)
+                if queue is not None and command.callback is not None:
+                    command.callback(start - command.queued)
+            target = entities[0] if len(entities) == 1 else entities
+            try:
+                async with asyncio.timeout(self.CALL_TIMEOUT):
+                    await self._hass.services.async_call(
+                        domain, service, {ATTR_ENTITY_ID: target}, blocking=True
+                    )
+            # pylint: disable=broad-except
+            except Exception as err:
+                self._coordinator.logger.log_switch_call_error(
+                    domain, service, entities, err
+                )
+                return
+            elapsed = tm.perf_counter() - start
+            self._latency[f"{domain}.{service}"] = elapsed
+            self._coordinator.logger.log_switch_call(
+                domain, service, entities, elapsed
+            )
+        finally:
+            if queue is not None:
+                queue.release()
+
+    def load(self, config: OrderedDict) -> "IUSwitchDispatcher":
+        """Load config data"""
+        if config is None:
+            config = {}
+        queue_config: dict = config.get(CONF_COMMAND_QUEUE, {})
+        self._concurrency = queue_config.get(CONF_CONCURRENCY, 0)
+        self._spacing = queue_config.get(CONF_SPACING, 0.0)
+        self._integrations = queue_config.get(CONF_INTEGRATIONS)
+        self._queues.clear()
+        return self
+
+
 class IUVolumeSensorError(Exception):
     """Error reading sensor"""
 
@@ -1148,7 +1623,7 @@ class IUVolumeSensorReading(NamedTuple):
     """Irrigation Unlimited volume sensor reading class"""
 
     timestamp: datetime
-    value: Decimal
+    value: int
 
 
 class IUVolume:
@@ -1158,6 +1633,11 @@ class IUVolume:
 
     MAX_READINGS = 20
     SMA_WINDOW = 10
+    BASELINE_RUNS = 3
+    BASELINE_WEIGHT = 0.2
+    ALERT_TARGET = 4
+    ALERT_HIGH_FLOW = 5
+    ALERT_LOW_FLOW = 6
     listeners: int = 0
     trackers: int = 0
 
@@ -1179,37 +1659,86 @@ class IUVolume:
         self._volume_scale: float = None
         self._flow_rate_precision: int = None
         self._flow_rate_scale: float = None
+        self._flow_rate_window: int = None
+        self._notify_interval: timedelta = None
+        self._log_summary: bool = None
+        self._target: float = None
+        self._flow_tolerance: float = None
+        self._flow_action: str = None
         # Private variables
         self._callback_remove: CALLBACK_TYPE = None
-        self._total_volume: Decimal = None
+        self._volume_units: int = None
+        self._total_volume: int = None
         self._total_readings: int = 0
         self._start_time: datetime = None
         self._end_time: datetime = None
         self._listeners: dict[str, Callable[[datetime, "IUZone", Decimal], None]] = {}
-        self._flow_rates: list[Decimal] = []
-        self._flow_rate_sum: Decimal = None
-        self._flow_rate_sma: Decimal = None
-        self._flow_rate_avg: Decimal = None
-        self._sensor_readings: list[IUVolumeSensorReading] = []
+        self._flow_rates: deque[float] = deque(maxlen=IUVolume.SMA_WINDOW)
+        self._flow_rate_sum: float = None
+        self._flow_rate_sma: float = None
+        self._flow_rate_avg: float = None
+        self._sensor_readings: deque[IUVolumeSensorReading] = deque(
+            maxlen=IUVolume.MAX_READINGS
+        )
         self._first_reading: IUVolumeSensorReading = None
         self._last_reading: IUVolumeSensorReading = None
+        self._notify_due: datetime = None
+        self._notify_pending = False
+        self._target_units: int = None
+        self._target_reached = False
+        self._flow_alert: int = None
+        self._baseline: float = None
+        self._baseline_runs: int = 0
         self._reset_config()
         self._reset_readings()
 
+    @property
+    def sensor_id(self) -> str:
+        """Return the entity_id of the volume sensor"""
+        return self._sensor_id
+
+    @property
+    def unit_of_measurement(self) -> str | None:
+        """Return the unit of the volume sensor. The unit is unknown when
+        the readings are scaled"""
+        if self._sensor_id is None or self._volume_scale != 1:
+            return None
+        if (sensor := self._hass.states.get(self._sensor_id)) is None:
+            return None
+        return sensor.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+
     @property
     def total(self) -> float | None:
         """Return the total value"""
         if self._total_volume is not None:
-            return float(self._total_volume)
+            return self._total_volume / self._volume_units
         return None
 
     @property
     def flow_rate(self) -> float | None:
         """Return the flow rate"""
         if self._flow_rate_avg is not None:
-            return float(self._flow_rate_avg)
+            return round(self._flow_rate_avg, self._flow_rate_precision)
+        return None
+
+    @property
+    def baseline(self) -> float | None:
+        """Return the learned flow rate of a normal run"""
+        if self._baseline is not None:
+            return round(self._baseline, self._flow_rate_precision)
         return None
 
+    @property
+    def flow_rate_sma(self) -> float | None:
+        """Return the moving average of the flow rate"""
+        if self._flow_rate_sma is not None:
+            return round(self._flow_rate_sma, self._flow_rate_precision)
+        return None
+
+    def _as_decimal(self, value: int) -> Decimal:
+        """Convert a scaled volume to a Decimal at the volume precision"""
+        return Decimal(value).scaleb(-self._volume_precision)
+
     def _reset_config(self) -> None:
         """Reset this object"""
         self.end_record(None)
@@ -1218,6 +1747,13 @@ class IUVolume:
         self._volume_scale = 1
         self._flow_rate_precision = 3
         self._flow_rate_scale = 3600
+        self._flow_rate_window = IUVolume.SMA_WINDOW
+        self._notify_interval = TD_ZERO
+        self._log_summary = False
+        self._target = None
+        self._flow_tolerance = None
+        self._flow_action = CONF_NOTIFY
+        self._volume_units = 10**self._volume_precision
 
     def _reset_readings(self) -> None:
         """Reset reading parameters"""
@@ -1226,9 +1762,13 @@ class IUVolume:
         self._start_time = None
         self._first_reading = None
         self._last_reading = None
+        self._notify_due = None
+        self._notify_pending = False
+        self._target_reached = False
+        self._flow_alert = None
         self._sensor_readings.clear()
         self._flow_rates.clear()
-        self._flow_rate_sum = 0
+        self._flow_rate_sum = 0.0
         self._flow_rate_sma = None
         self._flow_rate_avg = None
 
@@ -1249,32 +1789,54 @@ class IUVolume:
             self._flow_rate_scale = config.get(
                 CONF_FLOW_RATE_SCALE, self._flow_rate_scale
             )
+            self._flow_rate_window = config.get(
+                CONF_FLOW_RATE_WINDOW, self._flow_rate_window
+            )
+            if (interval := config.get(CONF_NOTIFY_INTERVAL)) is not None:
+                self._notify_interval = timedelta(seconds=interval)
+            self._log_summary = config.get(CONF_LOG_SUMMARY, self._log_summary)
+            self._target = config.get(CONF_TARGET, self._target)
+            self._flow_tolerance = config.get(CONF_FLOW_TOLERANCE, self._flow_tolerance)
+            self._flow_action = config.get(CONF_FLOW_ACTION, self._flow_action)
 
         self._reset_config()
         self._reset_readings()
+        self._baseline = None
+        self._baseline_runs = 0
         if all_zones is not None:
             load_params(all_zones.get(CONF_VOLUME))
         load_params(config.get(CONF_VOLUME))
+        self._volume_units = 10**self._volume_precision
+        if self._target is not None:
+            self._target_units = round(self._target * self._volume_units)
+        if self._flow_rates.maxlen != self._flow_rate_window:
+            self._flow_rates = deque(maxlen=self._flow_rate_window)
 
-    def _read_sensor(self, stime: datetime) -> None:
-        """Read the sensor data"""
-        sensor = self._hass.states.get(self._sensor_id)
+    @staticmethod
+    def read_sensor(hass: HomeAssistant, sensor_id: str) -> float:
+        """Read and parse the sensor value"""
+        sensor = hass.states.get(sensor_id)
         if sensor is None:
-            raise IUVolumeSensorError(f"Sensor not found: {self._sensor_id}")
+            raise IUVolumeSensorError(f"Sensor not found: {sensor_id}")
         value = float(sensor.state)
         if value < 0:
             raise ValueError(f"Negative sensor value: {sensor.state}")
+        return value
 
+    def _add_reading(self, stime: datetime, value: float) -> None:
+        """Add the sensor reading to the totals"""
         current_reading = IUVolumeSensorReading(
-            stime, Decimal(f"{value * self._volume_scale:.{self._volume_precision}f}")
+            stime,
+            round(
+                round(value * self._volume_scale, self._volume_precision)
+                * self._volume_units
+            ),
         )
 
         if len(self._sensor_readings) > 0:
             self._last_reading = self._sensor_readings[-1]
             volume_delta = current_reading.value - self._last_reading.value
-            time_delta = Decimal(
-                f"{(stime - self._last_reading.timestamp).total_seconds():.6f}"
-            )
+            time_delta = (stime - self._last_reading.timestamp).total_seconds()
 
             if time_delta == 0:
                 raise ValueError(f"Sensor time has not advanced: {stime}")
@@ -1287,8 +1849,8 @@ class IUVolume:
             if volume_delta < 0:
                 raise ValueError(
                     "Sensor value has gone backwards: "
-                    f"previous: {self._last_reading.value}, "
-                    f"current: {current_reading.value}"
+                    f"previous: {self._as_decimal(self._last_reading.value)}, "
+                    f"current: {self._as_decimal(current_reading.value)}"
                 )
 
             # Total
@@ -1296,34 +1858,34 @@ class IUVolume:
             total_time = current_reading.timestamp - self._first_reading.timestamp
 
             # SMA
-            rate = volume_delta * Decimal(self._flow_rate_scale) / time_delta
+            rate = (
+                volume_delta * self._flow_rate_scale / (self._volume_units * time_delta)
+            )
+            if len(self._flow_rates) == self._flow_rates.maxlen:
+                self._flow_rate_sum -= self._flow_rates[0]
             self._flow_rate_sum += rate
             self._flow_rates.append(rate)
-            if len(self._flow_rates) > IUVolume.SMA_WINDOW:
-                self._flow_rate_sum -= self._flow_rates.pop(0)
-            # pylint: disable=invalid-unary-operand-type
-            self._flow_rate_sma = (
-                self._flow_rate_sum / len(self._flow_rates)
-            ).quantize(Decimal(10) ** -self._flow_rate_precision)
+            self._flow_rate_sma = self._flow_rate_sum / len(self._flow_rates)
 
             # AVG
             if (secs := total_time.total_seconds()) > 0:
                 self._flow_rate_avg = (
-                    self._total_volume * Decimal(self._flow_rate_scale) / Decimal(secs)
-                ).quantize(Decimal(10) ** -self._flow_rate_precision)
+                    self._total_volume
+                    * self._flow_rate_scale
+                    / (self._volume_units * secs)
+                )
         else:
             self._first_reading = current_reading
             self._total_volume = 0
-            self._flow_rate_sma = 0
-            self._flow_rate_avg = 0
+            self._flow_rate_sma = 0.0
+            self._flow_rate_avg = 0.0
 
         # Update bookkeeping
         self._total_readings += 1
         self._sensor_readings.append(current_reading)
-        if len(self._sensor_readings) > IUVolume.MAX_READINGS:
-            self._sensor_readings.pop(0)
 
-    def event_hook(self, event: HAEvent) -> HAEvent:
+    @staticmethod
+    def event_hook(event: HAEvent) -> HAEvent:
         """A pass through place for testing to patch and update
         parameters in the event message"""
         return event
@@ -1333,29 +1895,147 @@ class IUVolume:
         event = self.event_hook(event)
         stime = event.time_fired
         try:
-            self._read_sensor(stime)
+            value = self.read_sensor(self._hass, self._sensor_id)
         except ValueError as e:
             self._coordinator.logger.log_invalid_meter_value(stime, e)
         except IUVolumeSensorError:
             self._coordinator.logger.log_invalid_meter_id(stime, self._sensor_id)
         else:
-            # Notifiy our trackers
-            for listener in list(self._listeners.values()):
-                await listener(
-                    stime,
-                    self._zone,
-                    self._total_volume,
+            await self.sensor_reading(stime, value)
+
+    async def sensor_reading(self, stime: datetime, value: float) -> None:
+        """Process a parsed reading from the sensor"""
+        try:
+            self._add_reading(stime, value)
+        except ValueError as e:
+            self._coordinator.logger.log_invalid_meter_value(stime, e)
+        else:
+            if self._zone is not None:
+                self._check_alerts(stime)
+            if self._notify_due is None or stime >= self._notify_due:
+                self._notify(stime, list(self._listeners.values()))
+            else:
+                self._notify_pending = True
+
+    def _check_alerts(self, stime: datetime) -> None:
+        """Check the delivered volume against the target and the moving
+        average against the baseline. Only the latest figures are looked
+        at so the cost per reading is fixed"""
+        if (
+            self._target is not None
+            and not self._target_reached
+            and self._total_volume >= self._target_units
+        ):
+            self._target_reached = True
+            self._alert(stime, IUVolume.ALERT_TARGET, True)
+
+        if (
+            self._flow_tolerance is None
+            or self._flow_alert is not None
+            or self._baseline_runs < IUVolume.BASELINE_RUNS
+            or len(self._flow_rates) < self._flow_rates.maxlen
+        ):
+            return
+        limit = self._baseline * self._flow_tolerance / 100
+        if self._flow_rate_sma > self._baseline + limit:
+            self._flow_alert = IUVolume.ALERT_HIGH_FLOW
+        elif self._flow_rate_sma < self._baseline - limit:
+            self._flow_alert = IUVolume.ALERT_LOW_FLOW
+        else:
+            return
+        self._alert(stime, self._flow_alert, self._flow_action == SERVICE_CANCEL)
+
+    def _alert(self, stime: datetime, reason: int, cancel: bool) -> None:
+        """Send out a flow alert and optionally end the run"""
+        self._coordinator.notify_valve(
+            reason,
+            stime,
+            True,
+            self._zone.switch.switch_entity_id,
+            self._controller,
+            self._zone,
+            EVENT_FLOW_ALERT,
+        )
+        if cancel:
+            self._hass.async_create_task(
+                self._hass.services.async_call(
+                    DOMAIN,
+                    SERVICE_CANCEL,
+                    {ATTR_ENTITY_ID: self._zone.entity_id},
                 )
+            )
+
+    def _learn_baseline(self) -> None:
+        """Fold the moving average of a normal run into the baseline. This
+        is the same window the alerts check so the ramp up is left out"""
+        if (
+            self._flow_alert is not None
+            or len(self._flow_rates) < self._flow_rates.maxlen
+            or not self._flow_rate_sma
+        ):
+            return
+        if self._baseline is None:
+            self._baseline = self._flow_rate_sma
+        else:
+            self._baseline += IUVolume.BASELINE_WEIGHT * (
+                self._flow_rate_sma - self._baseline
+            )
+        self._baseline_runs += 1
+
+    def _notify(
+        self,
+        stime: datetime,
+        listeners: list[Callable[[datetime, "IUZone", Decimal], None]],
+    ) -> None:
+        """Pass the total to the listeners and log the reading. Readings
+        within the notify interval are coalesced into the next one"""
+        self._notify_pending = False
+        self._notify_due = stime + self._notify_interval
+        total = self._as_decimal(self._total_volume)
+        self._call_listeners(stime, total, listeners)
+        self._log_reading(stime, total)
+
+    def _call_listeners(
+        self,
+        stime: datetime,
+        total: Decimal,
+        listeners: list[Callable[[datetime, "IUZone", Decimal], None]],
+    ) -> None:
+        """Notify our trackers"""
+        for listener in listeners:
+            listener(
+                stime,
+                self._zone,
+                total,
+            )
+
+    def _log_reading(self, stime: datetime, total: Decimal) -> None:
+        """Log the latest reading unless only summaries are wanted"""
+        if not self._log_summary:
             self._coordinator.logger.log_volume_reading(
                 stime,
                 self._controller,
                 self._zone,
                 self._sensor_id,
-                self._sensor_readings[-1].value,
-                self._total_volume,
-                self._flow_rate_avg,
+                self._as_decimal(self._sensor_readings[-1].value),
+                total,
+                self.flow_rate,
             )
 
+    def _flush(
+        self, listeners: list[Callable[[datetime, "IUZone", Decimal], None]]
+    ) -> None:
+        """Send out the total held back by the notify interval. This is
+        delivered before returning so the listeners see the final total
+        ahead of the recording ending"""
+        if self._notify_pending:
+            stime = self._sensor_readings[-1].timestamp
+            total = self._as_decimal(self._total_volume)
+            self._call_listeners(stime, total, listeners)
+            if len(listeners) == len(self._listeners):
+                self._notify_pending = False
+                self._log_reading(stime, total)
+
     def start_record(self, stime: datetime) -> None:
         """Start recording volume information"""
         self._reset_readings()
@@ -1363,10 +2043,9 @@ class IUVolume:
             return
 
         self._start_time = stime
-        self._callback_remove = async_track_state_change_event(
-            self._hass, self._sensor_id, self.sensor_state_change
+        self._callback_remove = self._coordinator.meters.subscribe(
+            self._sensor_id, self
         )
-        IUVolume.trackers += 1
 
     def end_record(self, stime: datetime | None) -> None:
         """Finish recording volume information"""
@@ -1378,12 +2057,26 @@ class IUVolume:
         ):
             if (secs := (self._end_time - self._start_time).total_seconds()) > 0:
                 self._flow_rate_avg = (
-                    self._total_volume * Decimal(self._flow_rate_scale) / Decimal(secs)
-                ).quantize(Decimal(10) ** -self._flow_rate_precision)
+                    self._total_volume
+                    * self._flow_rate_scale
+                    / (self._volume_units * secs)
+                )
         if self._callback_remove is not None:
             self._callback_remove()
             self._callback_remove = None
-            IUVolume.trackers -= 1
+            self._flush(list(self._listeners.values()))
+            if self._zone is not None and self._end_time is not None:
+                self._learn_baseline()
+            if self._log_summary and self._total_volume is not None:
+                self._coordinator.logger.log_volume_summary(
+                    stime,
+                    self._controller,
+                    self._zone,
+                    self._sensor_id,
+                    self._total_readings,
+                    self._as_decimal(self._total_volume),
+                    self.flow_rate,
+                )
 
     def track_volume_change(
         self, uid: int, action: Callable[[datetime, "IUZone", float], None]
@@ -1391,6 +2084,7 @@ class IUVolume:
         """Track the volume"""
 
         def remove_listener() -> None:
+            self._flush([self._listeners[uid]])
             del self._listeners[uid]
             IUVolume.listeners -= 1
 
@@ -1399,6 +2093,66 @@ class IUVolume:
         return remove_listener
 
 
+class IUMeterHub:
+    """Irrigation Unlimited meter hub class. Holds a single subscription
+    to each volume sensor and shares the readings out to the volume
+    objects recording from it"""
+
+    def __init__(self, hass: HomeAssistant, coordinator: "IUCoordinator") -> None:
+        # Passed parameters
+        self._hass = hass
+        self._coordinator = coordinator
+        # Private variables
+        self._consumers: dict[str, dict[IUVolume, None]] = {}
+        self._callbacks: dict[str, CALLBACK_TYPE] = {}
+
+    def subscribe(self, sensor_id: str, volume: IUVolume) -> CALLBACK_TYPE:
+        """Add the volume object to the consumers of the sensor"""
+        if (consumers := self._consumers.get(sensor_id)) is None:
+            consumers = self._consumers[sensor_id] = {}
+            self._callbacks[sensor_id] = async_track_state_change_event(
+                self._hass, sensor_id, self.sensor_state_change
+            )
+            IUVolume.trackers += 1
+        consumers[volume] = None
+
+        def unsubscribe() -> None:
+            del consumers[volume]
+            if not consumers:
+                del self._consumers[sensor_id]
+                self._callbacks.pop(sensor_id)()
+                IUVolume.trackers -= 1
+
+        return unsubscribe
+
+    async def sensor_state_change(self, event: HAEvent) -> None:
+        """Callback for when a sensor has changed. The reading is parsed
+        once for all the consumers. A missing or invalid meter is still
+        reported for each volume object"""
+        event = IUVolume.event_hook(event)
+        stime = event.time_fired
+        sensor_id = event.data[ATTR_ENTITY_ID]
+        if (consumers := self._consumers.get(sensor_id)) is None:
+            return
+        readings: dict[str, float | Exception] = {}
+        for volume in list(consumers):
+            if volume not in consumers:
+                continue
+            meter_id = volume.sensor_id
+            if (value := readings.get(meter_id)) is None:
+                try:
+                    value = IUVolume.read_sensor(self._hass, meter_id)
+                except (ValueError, IUVolumeSensorError) as e:
+                    value = e
+                readings[meter_id] = value
+            if isinstance(value, ValueError):
+                self._coordinator.logger.log_invalid_meter_value(stime, value)
+            elif isinstance(value, IUVolumeSensorError):
+                self._coordinator.logger.log_invalid_meter_id(stime, meter_id)
+            else:
+                await volume.sensor_reading(stime, value)
+
+
 class IURunStatus(Enum):
     """Flags for the status of IURun object"""
 
@@ -1410,7 +2164,10 @@ class IURunStatus(Enum):
 
     @staticmethod
     def status(
-        stime: datetime, start_time: datetime, end_time: datetime, paused: datetime
+        stime: datetime | int,
+        start_time: datetime | int,
+        end_time: datetime | int,
+        paused: datetime | int,
     ) -> "IURunStatus":
         """Determine the state of this object"""
         if paused is not None:
@@ -1432,6 +2189,23 @@ class IURun(IUBase):
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-many-public-methods
 
+    MANUAL_KEY: int = -(2**63)
+
+    __slots__ = (
+        "_start",
+        "_end",
+        "_duration",
+        "_zone",
+        "_schedule",
+        "_sequence_run",
+        "_zone_run",
+        "_remaining_time",
+        "_percent_complete",
+        "_pause",
+        "_status",
+        "master_run",
+    )
+
     def __init__(
         self,
         stime: datetime,
@@ -1445,17 +2219,17 @@ class IURun(IUBase):
         # pylint: disable=too-many-arguments, too-many-positional-arguments
         super().__init__(None)
         # Passed parameters
-        self._start_time: datetime = start_time
+        self._start: int = dt2epoch(start_time)
         self._duration: timedelta = duration
         self._zone = zone
         self._schedule = schedule
         self._sequence_run = sequence_run
         self._zone_run = zone_run
         # Private variables
-        self._end_time: datetime = self._start_time + self._duration
-        self._remaining_time: timedelta = self._end_time - self._start_time
+        self._end: int = dt2epoch(start_time + duration)
+        self._remaining_time: timedelta = timedelta(seconds=self._end - self._start)
         self._percent_complete: int = 0
-        self._pause_time: datetime = None
+        self._pause: int = None
         self._status = self._get_status(stime)
         self.master_run: "IURun" = None
 
@@ -1490,12 +2264,20 @@ class IURun(IUBase):
     @property
     def start_time(self) -> datetime:
         """Return the start time"""
-        return self._start_time
+        return epoch2dt(self._start)
 
     @start_time.setter
     def start_time(self, value: datetime) -> None:
         """Set the start time"""
-        self._start_time = value
+        self._start = dt2epoch(value)
+
+    @property
+    def sort_key(self) -> int:
+        """Return the numeric key used to order the run queue. Manual
+        runs always go to the head of the queue"""
+        if self._schedule is None:
+            return IURun.MANUAL_KEY
+        return self._start
 
     @property
     def duration(self) -> timedelta:
@@ -1536,12 +2318,12 @@ class IURun(IUBase):
     @property
     def end_time(self) -> datetime:
         """Return the finish time"""
-        return self._end_time
+        return epoch2dt(self._end)
 
     @end_time.setter
     def end_time(self, value: datetime) -> None:
         """Set the end time"""
-        self._end_time = value
+        self._end = dt2epoch(value)
 
     @property
     def time_remaining(self) -> timedelta:
@@ -1630,9 +2412,7 @@ class IURun(IUBase):
 
     def _get_status(self, stime: datetime) -> IURunStatus:
         """Determine the state of this run"""
-        return IURunStatus.status(
-            stime, self._start_time, self._end_time, self._pause_time
-        )
+        return IURunStatus.status(dt2epoch(stime), self._start, self._end, self._pause)
 
     def update_status(self, stime: datetime) -> None:
         """Update the status of the run"""
@@ -1641,9 +2421,11 @@ class IURun(IUBase):
     def update_time_remaining(self, stime: datetime) -> bool:
         """Update the count down timers"""
         if self.running:
-            self._remaining_time = self._end_time - stime
-            duration: timedelta = self._end_time - self._start_time
-            elapsed: timedelta = stime - self._start_time
+            start_time = self.start_time
+            end_time = self.end_time
+            self._remaining_time = end_time - stime
+            duration: timedelta = end_time - start_time
+            elapsed: timedelta = stime - start_time
             self._percent_complete = (
                 int((elapsed / duration) * 100) if duration > TD_ZERO else 0
             )
@@ -1652,26 +2434,26 @@ class IURun(IUBase):
 
     def pause(self, stime: datetime) -> None:
         """Change the pause status of the run"""
-        if self.expired or self._pause_time is not None:
+        if self.expired or self._pause is not None:
             return
-        self._pause_time = stime
+        self._pause = dt2epoch(stime)
         self.update_status(stime)
 
     def resume(self, stime: datetime) -> None:
         """Resume a paused run"""
-        if self.expired or self._pause_time is None:
+        if self.expired or self._pause is None:
             return
-        delta = stime - self._pause_time
-        self._start_time += delta
-        self._end_time += delta
-        self._pause_time = None
+        delta = dt2epoch(stime) - self._pause
+        self._start += delta
+        self._end += delta
+        self._pause = None
         self.update_status(stime)
 
     def as_dict(self) -> OrderedDict:
         """Return this run as a dict"""
         result = OrderedDict()
-        result[TIMELINE_START] = self._start_time
-        result[TIMELINE_END] = self._end_time
+        result[TIMELINE_START] = self.start_time
+        result[TIMELINE_END] = self.end_time
         result[TIMELINE_SCHEDULE] = self.schedule.id1 if self.schedule else 0
         result[TIMELINE_SCHEDULE_NAME] = self.schedule_name
         result[TIMELINE_ADJUSTMENT] = self.adjustment
@@ -1716,6 +2498,10 @@ class IURunQueue(list[IURun]):
         self._cancel_request: datetime = None
         self._next_event: datetime = None
         self._last_check_run: IURun = None
+        self._tails: dict[IUSchedule, IURun] = {}
+        self._checked: tuple[IURun, bool] = (None, False)
+        self._due: bool = False
+        self._rescheduled: bool = False
 
     @property
     def current_run(self) -> IURun:
@@ -1727,6 +2513,28 @@ class IURunQueue(list[IURun]):
         """Return the next run"""
         return self._next_run
 
+    @property
+    def due(self) -> bool:
+        """Return True if the current run has changed state since
+        the owner last checked"""
+        return self._due
+
+    @due.setter
+    def due(self, value: bool) -> None:
+        """Set or acknowledge the due flag"""
+        self._due = value
+
+    @property
+    def rescheduled(self) -> bool:
+        """Return True if the next state change has moved since the
+        owner last lodged its deadline"""
+        return self._rescheduled
+
+    @rescheduled.setter
+    def rescheduled(self, value: bool) -> None:
+        """Set or acknowledge the rescheduled flag"""
+        self._rescheduled = value
+
     @property
     def in_sequence(self) -> bool:
         """Return True if this run is part of a sequence"""
@@ -1750,6 +2558,10 @@ class IURunQueue(list[IURun]):
         run = IURun(stime, start_time, duration, zone, schedule, sequence_run, zone_run)
         self.append(run)
         self._sorted = False
+        if schedule is not None and schedule in self._tails:
+            tail = self._tails[schedule]
+            if tail is None or run.end_time > tail.end_time:
+                self._tails[schedule] = run
         return run
 
     def cancel(self, stime: datetime) -> bool:
@@ -1761,6 +2573,7 @@ class IURunQueue(list[IURun]):
         """Clear out all runs"""
         self._current_run = None
         self._next_run = None
+        self._tails.clear()
         super().clear()
 
     def clear_runs(self, include_sequence: bool) -> bool:
@@ -1792,11 +2605,18 @@ class IURunQueue(list[IURun]):
         return result
 
     def find_last_run(self, schedule: IUSchedule) -> IURun:
-        """Find the last run for the matching schedule"""
+        """Find the last run for the matching schedule. The result is kept
+        in the tail index and maintained as runs are added and removed"""
+        if schedule in self._tails:
+            return self._tails[schedule]
         i = self.find_last_index(schedule)
-        if i is not None:
-            return self[i]
-        return None
+        result = self[i] if i is not None else None
+        self._tails[schedule] = result
+        return result
+
+    def invalidate_tails(self) -> None:
+        """Run times have been altered. Rebuild the tail index on demand"""
+        self._tails.clear()
 
     def last_time(self, stime: datetime) -> datetime:
         """Return the further most look ahead date"""
@@ -1812,19 +2632,12 @@ class IURunQueue(list[IURun]):
         return self
 
     def sort(self) -> bool:
-        """Sort the run queue."""
-
-        def sorter(run: IURun) -> datetime:
-            """Sort call back routine. Items are sorted by start_time."""
-            if run.is_manual():
-                start = datetime.min  # Always put manual run at head
-            else:
-                start = run.start_time
-            return start.replace(tzinfo=None).isoformat(timespec="seconds")
-
+        """Sort the run queue. Items are sorted by start_time to the second
+        with manual runs at the head. New runs are appended to an already
+        sorted queue so this is mostly a merge."""
         if self._sorted:
             return False
-        super().sort(key=sorter)
+        super().sort(key=attrgetter("sort_key"))
         self._sorted = True
         return True
 
@@ -1865,6 +2678,8 @@ class IURunQueue(list[IURun]):
     def pop_run(self, index) -> "IURun":
         """Remove run from queue by index"""
         run = self.pop(index)
+        if run.schedule is not None and self._tails.get(run.schedule) is run:
+            del self._tails[run.schedule]  # Rebuilt on demand
         if run == self._current_run:
             self._current_run = None
             self._next_run = None
@@ -1875,9 +2690,21 @@ class IURunQueue(list[IURun]):
             run.master_run = None
         return run
 
+    def find_run(self, run: IURun) -> int:
+        """Return the index of the run. Use a binary search when the
+        queue is sorted otherwise fall back to a scan"""
+        if self._sorted:
+            key = run.sort_key
+            i = bisect_left(self, key, key=attrgetter("sort_key"))
+            while i < len(self) and self[i].sort_key == key:
+                if self[i] is run:
+                    return i
+                i += 1
+        return self.index(run)
+
     def remove_run(self, run: IURun) -> "IURun":
         """Remove the run from the queue"""
-        return self.pop_run(self.index(run))
+        return self.pop_run(self.find_run(run))
 
     def update_run_status(self, stime) -> None:
         """Update the status of the runs"""
@@ -1914,35 +2741,51 @@ class IURunQueue(list[IURun]):
                 status |= IURQStatus.CANCELED
             self._cancel_request = None
 
+        # Single pass to find the first running and future runs along
+        # with the next state change
+        first_running: IURun = None
+        first_future: IURun = None
+        next_event = IUDTMin.eot
+        for run in self:
+            if run.running:
+                if first_running is None and run.duration != TD_ZERO:
+                    first_running = run
+                next_event = min(next_event, run.end_time)
+            elif run.future:
+                if first_future is None and run.duration != TD_ZERO:
+                    first_future = run
+                next_event = min(next_event, run.start_time)
+            elif not (run.expired or run.paused):
+                next_event = min(next_event, run.start_time)
+        if next_event != self._next_event:
+            self._next_event = next_event
+            self._rescheduled = True
+
         # Try to find a running schedule
         if self._current_run is not None and self._current_run.expired:
             self._current_run = None
             status |= IURQStatus.UPDATED
-        if self._current_run is None:
-            for run in self:
-                if run.running and run.duration != TD_ZERO:
-                    self._current_run = run
-                    self._next_run = None
-                    status |= IURQStatus.UPDATED
-                    break
+        if self._current_run is None and first_running is not None:
+            self._current_run = first_running
+            self._next_run = None
+            status |= IURQStatus.UPDATED
 
         # Try to find the next schedule
         if self._next_run is not None and self._next_run.expired:
             self._next_run = None
             status |= IURQStatus.UPDATED
-        if self._next_run is None:
-            for run in self:
-                if run.future and run.duration != TD_ZERO:
-                    self._next_run = run
-                    status |= IURQStatus.UPDATED
-                    break
+        if self._next_run is None and first_future is not None:
+            self._next_run = first_future
+            status |= IURQStatus.UPDATED
 
-        # Figure out the next state change
-        dmin = IUDTMin()
-        for run in self:
-            if not (run.expired or run.paused):
-                dmin.record(run.end_time if run.running else run.start_time)
-        self._next_event = dmin.min
+        # Flag a transition for check_run
+        checked = (
+            self._current_run,
+            self._current_run is not None and self._current_run.running,
+        )
+        if checked != self._checked:
+            self._checked = checked
+            self._due = True
 
         return status
 
@@ -1973,6 +2816,18 @@ class IUScheduleQueue(IURunQueue):
         self._minimum: timedelta = None
         self._maximum: timedelta = None
         self._threshold: timedelta = None
+        # Private variables
+        self._unlinked: bool = False
+
+    @property
+    def unlinked(self) -> bool:
+        """Return True if there are runs without a master run"""
+        return self._unlinked
+
+    @unlinked.setter
+    def unlinked(self, value: bool) -> None:
+        """Flag the runs have been linked to the master queue"""
+        self._unlinked = value
 
     def constrain(self, duration: timedelta) -> timedelta:
         """Impose constraints on the duration"""
@@ -2001,6 +2856,7 @@ class IUScheduleQueue(IURunQueue):
         """Add a new run to the queue"""
         # pylint: disable=arguments-differ
         # pylint: disable=too-many-arguments, too-many-positional-arguments
+        self._unlinked = True
         return super().add(
             stime,
             start_time,
@@ -2242,6 +3098,7 @@ class IUZone(IUBase):
             self._suspend_until = value
             self._dirty = True
             self.request_update()
+            self.lodge()
 
     @property
     def allow_manual(self) -> bool:
@@ -2282,6 +3139,16 @@ class IUZone(IUBase):
         """Return the total volume time for today"""
         return self._coordinator.history.today_total_volume(self.entity_id)
 
+    @property
+    def last_24h_total(self) -> IUTodayTotal:
+        """Return the on time and volume for the last 24 hours"""
+        return self._coordinator.history.last_24h_total(self.entity_id)
+
+    @property
+    def last_7d_total(self) -> IUTodayTotal:
+        """Return the on time and volume for the last 7 days"""
+        return self._coordinator.history.last_7d_total(self.entity_id)
+
     @property
     def icon(self) -> str:
         """Return the icon to use in the frontend."""
@@ -2508,6 +3375,7 @@ class IUZone(IUBase):
         if self._suspend_until is not None and stime >= self._suspend_until:
             self._suspend_until = None
             status |= IURQStatus.CHANGED
+            self.lodge()
 
         self._switch.muster(stime)
 
@@ -2551,46 +3419,53 @@ class IUZone(IUBase):
         if state_changed:
             self._is_on = not self._is_on
             self.request_update()
+            self.lodge()
 
         return state_changed
 
     def request_update(self) -> None:
         """Flag the sensor needs an update"""
         self._sensor_update_required = True
+        self.request_visit()
+
+    def request_visit(self) -> None:
+        """Visit this zone in the next update_sensor"""
+        self._controller.sensor_due(self)
+
+    def lodge(self) -> None:
+        """Register the next wake up with the coordinator"""
+        self._coordinator.deadlines.set(self, self.next_awakening())
 
     def schedule_update(self, stime: datetime) -> None:
         """Schedule a HA update of the sensor"""
-        self._zone_sensor.schedule_update_ha_state()
+        self._coordinator.schedule_entity_update(self._zone_sensor)
         self._sensor_update_required = False
         self._sensor_last_update = stime
+        self.lodge()
 
-    def update_sensor(self, stime: datetime, do_on: bool) -> bool:
+    def update_sensor(self, stime: datetime) -> bool:
         """Lazy sensor updater"""
         updated = False
         do_update = False
 
         if self._zone_sensor is not None:
-            if do_on is False:
-                updated |= self._run_queue.update_sensor(stime)
-                if not self._is_on:
-                    # Force a refresh at midnight for the total_today attribute
-                    if (
-                        self._sensor_last_update is not None
-                        and dt.as_local(self._sensor_last_update).toordinal()
-                        != dt.as_local(stime).toordinal()
-                    ):
-                        do_update = True
-                    do_update |= self._sensor_update_required
-            else:
-                if self._is_on:
-                    # If we are running then update sensor according to refresh_interval
-                    if self._run_queue.current_run is not None:
-                        do_update = (
-                            self._sensor_last_update is None
-                            or stime - self._sensor_last_update
-                            >= self._coordinator.refresh_interval
-                        )
-                    do_update |= self._sensor_update_required
+            updated |= self._run_queue.update_sensor(stime)
+            if self._is_on:
+                # If we are running then update sensor according to refresh_interval
+                if self._run_queue.current_run is not None:
+                    do_update = (
+                        self._sensor_last_update is None
+                        or stime - self._sensor_last_update
+                        >= self._coordinator.refresh_interval
+                    )
+            elif (
+                self._sensor_last_update is not None
+                and dt.as_local(self._sensor_last_update).toordinal()
+                != dt.as_local(stime).toordinal()
+            ):
+                # Force a refresh at midnight for the total_today attribute
+                do_update = True
+            do_update |= self._sensor_update_required
 
         if do_update:
             self.schedule_update(stime)
@@ -2616,6 +3491,31 @@ class IUZone(IUBase):
         self._switch.call_switch(state, stime)
         self._coordinator.status_changed(stime, self._controller, self, state)
 
+    def report_state(self, stime: datetime) -> None:
+        """Report the state change to the history and statistics"""
+        attr = {}
+        if self._is_on:
+            if (run := self._run_queue.current_run) is not None:
+                attr[ATTR_CURRENT_ADJUSTMENT] = run.adjustment
+                if run.schedule is not None:
+                    attr[ATTR_CURRENT_SCHEDULE] = run.schedule.index + 1
+                    attr[ATTR_CURRENT_NAME] = run.schedule.name
+                else:
+                    attr[ATTR_CURRENT_SCHEDULE] = 0
+                    attr[ATTR_CURRENT_NAME] = RES_MANUAL
+        else:
+            attr[ATTR_VOLUME] = self._volume.total
+            attr[ATTR_FLOW_RATE] = self._volume.flow_rate
+        self._coordinator.history.record(self.entity_id, stime, self._is_on, attr)
+        self._coordinator.statistics.record(
+            self.unique_id,
+            self.name,
+            stime,
+            self._is_on,
+            attr.get(ATTR_VOLUME),
+            self._volume.unit_of_measurement,
+        )
+
 
 class IUZoneQueue(IURunQueue):
     """Class to hold the upcoming zones to run"""
@@ -2653,13 +3553,18 @@ class IUZoneQueue(IURunQueue):
         preamble: timedelta,
         postamble: timedelta,
     ) -> IURQStatus:
-        """Create a superset of all the zones."""
+        """Create a superset of all the zones. Only zones with runs that
+        are not yet in the master queue are visited, existing entries are
+        left in place."""
 
         status = IURQStatus(0)
         for zone in zones:
+            if not zone.runs.unlinked:
+                continue
             for run in zone.runs:
                 if run.master_run is None:
                     run.master_run = self.add_zone(stime, run, preamble, postamble)
+            zone.runs.unlinked = False
         status |= IURQStatus.EXTENDED | IURQStatus.REDUCED
         return status
 
@@ -2746,6 +3651,7 @@ class IUSequenceZone(IUBase):
     @suspended.setter
     def suspended(self, value: datetime) -> None:
         self._suspend_until = value
+        self._sequence.lodge()
 
     @property
     def adjustment(self) -> IUAdjustment:
@@ -2915,6 +3821,29 @@ class IUSequenceRun(IUBase):
 
     # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-many-public-methods
+
+    __slots__ = (
+        "_coordinator",
+        "_controller",
+        "_sequence",
+        "_schedule",
+        "_runs_pre_allocate",
+        "_runs",
+        "_active_zone",
+        "_current_zone",
+        "_start_time",
+        "_end_time",
+        "_accumulated_duration",
+        "_first_zone",
+        "_status",
+        "_paused",
+        "_last_pause",
+        "_volume_trackers",
+        "_volume_stats",
+        "_remaining_time",
+        "_percent_complete",
+    )
+
     def __init__(
         self,
         coordinator: "IUCoordinator",
@@ -3245,6 +4174,7 @@ class IUSequenceRun(IUBase):
             self.update_time_remaining(stime)
             self.update_status(stime)
             self.update(stime)
+            self.invalidate_tails()
 
     def skip(self, stime: datetime) -> None:
         """Skip to the next sequence zone"""
@@ -3364,6 +4294,7 @@ class IUSequenceRun(IUBase):
         pause_run(stime, pause_list)
         self._paused = stime
         self._status = IURunStatus.PAUSED
+        self.invalidate_tails()
 
     def resume(self, stime: datetime) -> None:
         """Resume the sequence run"""
@@ -3381,6 +4312,7 @@ class IUSequenceRun(IUBase):
         self._end_time += stime - self._paused
         self._paused = None
         self.update_status(stime)
+        self.invalidate_tails()
 
         next_start = min(
             (run.start_time for run in self._runs if not run.expired), default=None
@@ -3398,11 +4330,18 @@ class IUSequenceRun(IUBase):
         """Cancel the sequence run"""
         self.advance(stime, -(self._end_time - stime))
 
-    async def update_volume(
-        self, stime: datetime, zone: IUZone, volume: Decimal
-    ) -> None:
+    def invalidate_tails(self) -> None:
+        """The run times have been altered. Drop the tail indexes of the
+        queues holding the runs"""
+        self._sequence.runs.invalidate_tails()
+        for zone in {run.zone for run in self._runs}:
+            zone.runs.invalidate_tails()
+
+    def update_volume(self, stime: datetime, zone: IUZone, volume: Decimal) -> None:
         """Notification for when the volume has changed"""
         # pylint: disable=unused-argument
+        if self._active_zone is None:
+            return
         if self._active_zone not in self._volume_stats:
             self._volume_stats[self._active_zone] = {}
         self._volume_stats[self._active_zone][zone] = volume
@@ -3412,12 +4351,20 @@ class IUSequenceRun(IUBase):
         if (limit := self._active_zone.sequence_zone.volume) is not None:
             current_vol = sum(self._volume_stats[self._active_zone].values())
             if current_vol >= limit:
-                await self._coordinator.hass.services.async_call(
-                    DOMAIN,
-                    SERVICE_SKIP,
-                    {ATTR_ENTITY_ID: self._sequence.entity_id},
+                self._coordinator.hass.async_create_task(
+                    self._async_skip(self._active_zone)
                 )
 
+    async def _async_skip(self, sequence_zone_run: IUSequenceZoneRun) -> None:
+        """Skip the sequence zone that reached its volume limit. Nothing is
+        done if the sequence has moved on in the meantime"""
+        if self._active_zone == sequence_zone_run:
+            await self._coordinator.hass.services.async_call(
+                DOMAIN,
+                SERVICE_SKIP,
+                {ATTR_ENTITY_ID: self._sequence.entity_id},
+            )
+
     def update(self, stime: datetime) -> bool:
         """Update the status of the sequence"""
 
@@ -3475,17 +4422,18 @@ class IUSequenceRun(IUBase):
                 result |= True
 
             elif run["status"] == IURunStatus.RUNNING and szr != self._active_zone:
-                # Sequence zone is changing
+                # Sequence zone is changing. Trackers flush their held back
+                # volume so remove them while the old zone is still active
+                remove_trackers()
                 self._active_zone = szr
                 self._current_zone = szr
-                remove_trackers()
                 enable_trackers(szr.sequence_zone)
                 result |= True
 
             elif run["status"] != IURunStatus.RUNNING and szr == self._active_zone:
                 # Sequence zone is finishing
-                self._active_zone = None
                 remove_trackers()
+                self._active_zone = None
                 if run["end_time"] == last_date:
                     # Sequence is finishing
                     self._status = IURunStatus.EXPIRED
@@ -3613,6 +4561,14 @@ class IUSequenceQueue(list[IUSequenceRun]):
         self._next_run: IUSequenceRun = None
         self._sorted: bool = False
         self._next_event: datetime = None
+        self._tails: dict[IUSchedule, tuple[IURun, datetime]] = {}
+        self._checked: tuple[IUSequenceRun, bool, bool, bool] = (
+            None,
+            False,
+            False,
+            False,
+        )
+        self._due: bool = False
 
     @property
     def current_run(self) -> IUSequenceRun | None:
@@ -3624,6 +4580,17 @@ class IUSequenceQueue(list[IUSequenceRun]):
         """Return the next sequence run"""
         return self._next_run
 
+    @property
+    def due(self) -> bool:
+        """Return True if the current run has changed state since
+        the sequence last checked"""
+        return self._due
+
+    @due.setter
+    def due(self, value: bool) -> None:
+        """Set or acknowledge the due flag"""
+        self._due = value
+
     @property
     def current_duration(self) -> timedelta:
         """Return the current active duration"""
@@ -3649,13 +4616,54 @@ class IUSequenceQueue(list[IUSequenceRun]):
         """Add a sequence run to the queue"""
         self.append(run)
         self._sorted = False
+        if run.schedule is not None and run.schedule in self._tails:
+            # Carry on the scan from where it left off
+            self._tails[run.schedule] = self._scan_tail(
+                self._tails[run.schedule], run
+            )
         return run
 
     def clear_all(self) -> None:
         """Clear out all runs"""
         self._current_run = None
+        self._tails.clear()
         super().clear()
 
+    def pop_run(self, index: int) -> IUSequenceRun:
+        """Remove the sequence run from the queue by index"""
+        run = self.pop(index)
+        self._tails.pop(run.schedule, None)  # Rebuilt on demand
+        return run
+
+    @staticmethod
+    def _scan_tail(
+        tail: tuple[IURun, datetime], sqr: IUSequenceRun
+    ) -> tuple[IURun, datetime]:
+        """Advance the tail scan over the runs of the sequence run"""
+        result, next_time = tail
+        for run in sqr.runs:
+            if next_time is None or run.end_time > next_time:
+                next_time = run.start_time
+                result = run
+        return (result, next_time)
+
+    def find_last_run(self, schedule: IUSchedule) -> IUSequenceRun | None:
+        """Return the sequence run that holds the last zone run for the
+        schedule. The scan position is kept in the tail index so added
+        runs carry on from it"""
+        if (tail := self._tails.get(schedule)) is None:
+            tail = (None, None)
+            for sqr in self:
+                if sqr.schedule == schedule:
+                    tail = self._scan_tail(tail, sqr)
+            self._tails[schedule] = tail
+        result = tail[0]
+        return result.sequence_run if result is not None else None
+
+    def invalidate_tails(self) -> None:
+        """Run times have been altered. Rebuild the tail index on demand"""
+        self._tails.clear()
+
     def clear_runs(self) -> bool:
         """Clear out future schedules."""
         modified = False
@@ -3665,7 +4673,7 @@ class IUSequenceQueue(list[IUSequenceRun]):
                 for run in sqr.runs:
                     run.zone.runs.remove_run(run)
                     run.zone.request_update()
-                self.pop(i)
+                self.pop_run(i)
                 modified = True
             i -= 1
         if modified:
@@ -3687,6 +4695,7 @@ class IUSequenceQueue(list[IUSequenceRun]):
         super().sort(key=sorter)
         self._current_run = None
         self._next_run = None
+        self._tails.clear()  # The scan follows the queue order
         self._sorted = True
         return True
 
@@ -3699,7 +4708,7 @@ class IUSequenceQueue(list[IUSequenceRun]):
         while i >= 0:
             sqr = self[i]
             if sqr.expired and stime >= sqr.end_time + postamble:
-                self.pop(i)
+                self.pop_run(i)
                 modified = True
             i -= 1
         return modified
@@ -3749,6 +4758,18 @@ class IUSequenceQueue(list[IUSequenceRun]):
             dmin.record(run.end_time if run.running else run.start_time)
         self._next_event = dmin.min
 
+        # Flag a transition for check_run
+        run = self._current_run
+        checked = (
+            run,
+            run is not None and run.running,
+            run is not None and run.paused,
+            run is not None and run.active_zone is None,
+        )
+        if checked != self._checked:
+            self._checked = checked
+            self._due = True
+
         return status
 
     def update_sensor(self, stime: datetime) -> bool:
@@ -3924,6 +4945,7 @@ class IUSequence(IUBase):
             self._suspend_until = value
             self._dirty = True
             self.request_update()
+            self.lodge()
 
     @property
     def adjustment(self) -> IUAdjustment:
@@ -4243,6 +5265,9 @@ class IUSequence(IUBase):
         for sequence_zone in self._zones:
             status |= sequence_zone.muster(stime)
 
+        if status.has_any(IURQStatus.CHANGED):
+            self.lodge()
+
         self._dirty = False
         return status
 
@@ -4275,33 +5300,49 @@ class IUSequence(IUBase):
 
         return state_changed
 
+    def report_state(self, stime: datetime) -> None:
+        """Report the state change to the statistics"""
+        units = {zone.volume.unit_of_measurement for zone in self.zone_list()}
+        self._coordinator.statistics.record(
+            self.unique_id,
+            self.name,
+            stime,
+            self._is_on,
+            None if self._is_on else self.volume,
+            units.pop() if len(units) == 1 else None,
+        )
+
     def request_update(self) -> None:
         """Flag the sensor needs an update"""
         self._sensor_update_required = True
+        self.request_visit()
+
+    def request_visit(self) -> None:
+        """Visit this sequence in the next update_sensor"""
+        self._controller.sensor_due(self)
+
+    def lodge(self) -> None:
+        """Register the next wake up with the coordinator"""
+        self._coordinator.deadlines.set(self, self.next_awakening())
 
-    def update_sensor(self, stime: datetime, do_on: bool) -> bool:
+    def update_sensor(self, stime: datetime) -> bool:
         """Lazy sensor updater"""
         updated: bool = False
         do_update: bool = False
 
         if self._sequence_sensor is not None:
-            if do_on is False:
-                updated |= self._run_queue.update_sensor(stime)
-                do_update = not self.is_on and self._sensor_update_required
-            else:
-                if self.is_on:
-                    # If we are running then update sensor according to refresh_interval
-                    do_update = (
-                        self._sensor_last_update is None
-                        or stime - self._sensor_last_update
-                        >= self._coordinator.refresh_interval
-                    )
-                    do_update |= self._sensor_update_required
-        else:
-            do_update = False
+            updated |= self._run_queue.update_sensor(stime)
+            if self.is_on:
+                # If we are running then update sensor according to refresh_interval
+                do_update = (
+                    self._sensor_last_update is None
+                    or stime - self._sensor_last_update
+                    >= self._coordinator.refresh_interval
+                )
+            do_update |= self._sensor_update_required
 
         if do_update:
-            self._sequence_sensor.schedule_update_ha_state()
+            self._coordinator.schedule_entity_update(self._sequence_sensor)
             self._sensor_update_required = False
             self._sensor_last_update = stime
             updated = True
@@ -4505,6 +5546,14 @@ class IUController(IUBase):
         self._volume = IUVolume(hass, coordinator, self, None)
         self._user = IUUser()
         self._dirty: bool = True
+        self._stale: bool = False
+        self._dependencies: dict[IUZone, list[IUSequence]] = None
+        self._due_zones: set[IUZone] = set()
+        self._due_sequences: set[IUSequence] = set()
+        self._checked_enabled: tuple[bool, bool] = None
+        self._sensor_zones: set[IUZone] = set()
+        self._sensor_sequences: set[IUSequence] = set()
+        self._active_sequences: set[IUSequence] = set()
 
     @property
     def controller_id(self) -> str:
@@ -4576,7 +5625,7 @@ class IUController(IUBase):
         """Enable/disable this controller"""
         if value != self._enabled:
             self._enabled = value
-            self._dirty = True
+            self._stale = True
             self.request_update(True)
 
     @property
@@ -4589,8 +5638,9 @@ class IUController(IUBase):
         """Set the suspend date for this controller"""
         if value != self._suspend_until:
             self._suspend_until = value
-            self._dirty = True
+            self._stale = True
             self.request_update(True)
+            self.lodge()
 
     @property
     def master_sensor(self) -> Entity:
@@ -4742,6 +5792,39 @@ class IUController(IUBase):
         # self._zones.clear()
         self.clear_zones(None)
 
+    def dependent_sequences(self, zone: IUZone) -> list[IUSequence]:
+        """Return the sequences that reference the zone. The map is
+        built on demand and discarded when the configuration changes"""
+        if self._dependencies is None:
+            self._dependencies = {}
+            for sequence in self._sequences:
+                for szn in sequence.zone_list():
+                    self._dependencies.setdefault(szn, []).append(sequence)
+        return self._dependencies.get(zone, [])
+
+    def stale_zones(self) -> set[IUZone]:
+        """Return the zones with runs that depend on the controller state.
+        Scheduled runs that have not started are left alone. Running and
+        manual runs are taken along with every zone the sequences they
+        touch reference"""
+        zones = {
+            zone
+            for zone in self._zones
+            if any(run.running or run.is_manual() for run in zone.runs)
+        }
+        sequences = {
+            sequence
+            for sequence in self._sequences
+            if any(run.running or run.is_manual() for run in sequence.runs)
+        }
+        while True:
+            for zone in zones:
+                sequences.update(self.dependent_sequences(zone))
+            extra = {szn for seq in sequences for szn in seq.zone_list()} - zones
+            if not extra:
+                return zones
+            zones |= extra
+
     def clear_zones(self, zones: list[IUZone]) -> None:
         """Clear out the specified zone run queues"""
         if zones is None:
@@ -4751,26 +5834,32 @@ class IUController(IUBase):
             for zone in self._zones:
                 zone.runs.clear_all()
         else:
-            for run in self.runs:
-                if run.zone in zones:
-                    self.runs.remove(run)
-            for sequence in self._sequences:
-                for zone in sequence.zone_list():
-                    if zone in zones:
-                        sequence.runs.clear_all()
+            for run in [run for run in self.runs if run.zone in zones]:
+                self.runs.remove_run(run)
+            sequences: set[IUSequence] = set()
+            for zone in zones:
+                sequences.update(self.dependent_sequences(zone))
+            for sequence in sequences:
+                sequence.runs.clear_all()
             for zone in zones:
                 zone.runs.clear_all()
 
     def clear_zone_runs(self, zone: IUZone) -> None:
         """Clear out zone run queues"""
         zone.runs.clear_runs()
-        for sequence in self._sequences:
-            if zone in sequence.zone_list():
-                sequence.runs.clear_runs()
+        for sequence in self.dependent_sequences(zone):
+            sequence.runs.clear_runs()
 
     def load(self, config: OrderedDict) -> "IUController":
         """Load config data for the controller"""
         self.clear()
+        self._stale = False
+        self._due_zones.clear()
+        self._due_sequences.clear()
+        self._checked_enabled = None
+        self._sensor_zones.clear()
+        self._sensor_sequences.clear()
+        self._active_sequences.clear()
         self._enabled = config.get(CONF_ENABLED, self._enabled)
         self._name = config.get(CONF_NAME, f"Controller {self.index + 1}")
         self._controller_id = config.get(CONF_CONTROLLER_ID, str(self.index + 1))
@@ -4802,6 +5891,7 @@ class IUController(IUBase):
         self._switch.load(config, None)
         self._volume.load(config, None)
         self._user.load(config, None)
+        self._dependencies = None
         self._dirty = True
         return self
 
@@ -4888,21 +5978,10 @@ class IUController(IUBase):
                         return True
                 return False
 
-            def find_last_run(sequence: IUSequence, schedule: IUSchedule) -> IURun:
-                result: IUSequenceRun = None
-                next_time: datetime = None
-                for sqr in sequence.runs:
-                    if sqr.schedule == schedule:
-                        for run in sqr.runs:
-                            if next_time is None or run.end_time > next_time:
-                                next_time = run.start_time
-                                result = run
-                return result
-
             if schedule is not None:
-                last_run = find_last_run(sequence, schedule)
+                last_run = sequence.runs.find_last_run(schedule)
                 if last_run is not None:
-                    next_time = last_run.sequence_run.end_time
+                    next_time = last_run.end_time
                 else:
                     next_time = stime
                 next_run = schedule.get_next_run(
@@ -4940,10 +6019,19 @@ class IUController(IUBase):
         if self._dirty or force:
             self.clear_zones(None)
             status |= IURQStatus.CLEARED
+            # The register is emptied on load, lodge everything once
+            for zone in self._zones:
+                zone.lodge()
+            for sequence in self._sequences:
+                sequence.lodge()
         else:
             for zone in self._zones:
                 zone.runs.update_run_status(stime)
             self._run_queue.update_run_status(stime)
+            if self._stale and (zones := self.stale_zones()):
+                self.clear_zones(list(zones))
+                status |= IURQStatus.CLEARED
+        self._stale = False
 
         if self._suspend_until is not None and stime >= self._suspend_until:
             self._suspend_until = None
@@ -4955,12 +6043,16 @@ class IUController(IUBase):
 
         # Handle initialisation
         for zone in self._zones:
-            zone_status |= zone.muster(stime)
+            zms = zone.muster(stime)
+            if not zms.is_empty():
+                self._due_zones.add(zone)
+                zone_status |= zms
 
         for sequence in self._sequences:
             sms = sequence.muster(stime)
             if not sms.is_empty():
                 sequence.runs.clear_runs()
+                self._due_sequences.add(sequence)
                 zone_status |= sms
 
         # Process sequence schedules
@@ -4984,12 +6076,21 @@ class IUController(IUBase):
             sst = sequence.runs.update_queue(stime)
             if sst.has_any(IURQStatus.UPDATED):
                 sequence.request_update()
+            if sequence.runs.due:
+                sequence.runs.due = False
+                self._due_sequences.add(sequence)
             zone_status |= sst
 
         for zone in self._zones:
             zts = zone.runs.update_queue()
             if zts.has_any(IURQStatus.CANCELED | IURQStatus.UPDATED):
                 zone.request_update()
+            if zone.runs.due:
+                zone.runs.due = False
+                self._due_zones.add(zone)
+            if zone.runs.rescheduled:
+                zone.runs.rescheduled = False
+                zone.lodge()
             zone_status |= zts
 
         if zone_status.has_any(
@@ -5003,13 +6104,19 @@ class IUController(IUBase):
                 stime, self._zones, self._preamble, self._postamble
             )
         status |= self._run_queue.update_queue()
+        if self._run_queue.rescheduled or status.has_any(IURQStatus.CHANGED):
+            self._run_queue.rescheduled = False
+            self.lodge()
 
-        # Purge expired runs
+        # Purge expired runs. The timeline attribute changes so the
+        # sensors need a write
         for sequence in self._sequences:
             if sequence.runs.remove_expired(stime, self._postamble):
+                sequence.request_update()
                 zone_status |= IURQStatus.REDUCED
         for zone in self._zones:
             if zone.runs.remove_expired(stime, self._postamble):
+                zone.request_update()
                 status |= IURQStatus.REDUCED
 
         if not status.is_empty():
@@ -5022,47 +6129,70 @@ class IUController(IUBase):
         """Check the run status and update sensors. Return flag
         if anything has changed."""
         # pylint: disable=too-many-branches
-        for sequence in self._sequences:
-            sequence.check_run(stime, self.is_enabled)
-
-        zones_changed: list[int] = []
-
         run = self._run_queue.current_run
         is_enabled = self.is_enabled or (run is not None and run.is_manual())
         is_running = is_enabled and run is not None
         state_changed = is_running ^ self._is_on
 
+        # Only visit zones and sequences with a transition due. Everything
+        # is visited when the enabled state passed down has changed.
+        if (checked := (self.is_enabled, is_enabled)) != self._checked_enabled:
+            self._checked_enabled = checked
+            due_sequences = self._sequences
+            due_zones = self._zones
+        else:
+            due_sequences = sorted(self._due_sequences, key=attrgetter("index"))
+            due_zones = sorted(self._due_zones, key=attrgetter("index"))
+        self._due_sequences.clear()
+        self._due_zones.clear()
+
+        for sequence in due_sequences:
+            if sequence.check_run(stime, self.is_enabled):
+                sequence.report_state(stime)
+            if sequence.is_on:
+                self._active_sequences.add(sequence)
+            else:
+                self._active_sequences.discard(sequence)
+
+        zones_changed: list[IUZone] = []
+
         # Gather zones that have changed status
-        for zone in self._zones:
+        for zone in due_zones:
             if zone.check_run(is_enabled):
-                zones_changed.append(zone.index)
+                zones_changed.append(zone)
 
         # Handle off zones before master
-        for zone in (self._zones[i] for i in zones_changed):
+        for zone in zones_changed:
             if not zone.is_on:
                 zone.volume.end_record(stime)
                 zone.call_switch(zone.is_on, stime)
+                zone.report_state(stime)
+        self._coordinator.dispatcher.barrier()
 
         # Check if master has changed and update
         if state_changed:
             self._is_on = not self._is_on
             self.request_update(False)
+            self.lodge()
             self.call_switch(self._is_on, stime)
             if self._is_on:
                 self._volume.start_record(stime)
             else:
                 self._volume.end_record(stime)
+            self.report_state(stime)
+        self._coordinator.dispatcher.barrier()
         if self._run_queue.check_last_run():
             self._coordinator.notify_valve(
                 3, stime, True, self._switch.switch_entity_id, self, None
             )
 
         # Handle on zones after master
-        for zone in (self._zones[i] for i in zones_changed):
+        for zone in zones_changed:
             if zone.is_on:
                 zone.call_switch(zone.is_on, stime)
                 zone.volume.start_record(stime)
-        for zone in self._zones:
+                zone.report_state(stime)
+        for zone in due_zones:
             if zone.runs.check_last_run():
                 self._coordinator.notify_valve(
                     3, stime, True, zone.switch.switch_entity_id, self, zone
@@ -5110,15 +6240,24 @@ class IUController(IUBase):
             for sequence in self._sequences:
                 sequence.request_update()
 
-    def update_sensor(self, stime: datetime) -> None:
-        """Lazy sensor updater."""
-        self._run_queue.update_sensor(stime)
+    def request_visit(self) -> None:
+        """The controller is visited on every update_sensor"""
 
-        for zone in self._zones:
-            zone.update_sensor(stime, False)
+    def sensor_due(self, item: IUZone | IUSequence) -> None:
+        """Flag the zone or sequence for a visit in the next update_sensor"""
+        if isinstance(item, IUZone):
+            self._sensor_zones.add(item)
+        else:
+            self._sensor_sequences.add(item)
 
-        for sequence in self._sequences:
-            sequence.update_sensor(stime, False)
+    def lodge(self) -> None:
+        """Register the next wake up with the coordinator"""
+        self._coordinator.deadlines.set(self, self.next_awakening())
+
+    def update_sensor(self, stime: datetime) -> None:
+        """Lazy sensor updater. Only the zones and sequences with a
+        pending update, a due deadline or a running sequence are visited"""
+        self._run_queue.update_sensor(stime)
 
         if self._master_sensor is not None:
             do_update: bool = self._sensor_update_required
@@ -5133,15 +6272,25 @@ class IUController(IUBase):
                 )
 
             if do_update:
-                self._master_sensor.schedule_update_ha_state()
+                self._coordinator.schedule_entity_update(self._master_sensor)
                 self._sensor_update_required = False
                 self._sensor_last_update = stime
 
-        for zone in self._zones:
-            zone.update_sensor(stime, True)
+        self.lodge()
 
-        for sequence in self._sequences:
-            sequence.update_sensor(stime, True)
+        zones = sorted(self._sensor_zones, key=attrgetter("index"))
+        self._sensor_zones.clear()
+        for zone in zones:
+            zone.update_sensor(stime)
+            zone.lodge()
+
+        sequences = sorted(
+            self._sensor_sequences | self._active_sequences, key=attrgetter("index")
+        )
+        self._sensor_sequences.clear()
+        for sequence in sequences:
+            sequence.update_sensor(stime)
+            sequence.lodge()
 
     def next_awakening(self) -> datetime:
         """Return the next event time"""
@@ -5149,8 +6298,6 @@ class IUController(IUBase):
             self._suspend_until,
             self._run_queue.next_event(),
             self._switch.next_event(),
-            (zone.next_awakening() for zone in self._zones),
-            (seq.next_awakening() for seq in self._sequences),
         )
         if self._is_on and self._sensor_last_update is not None:
             dmin.record(self._sensor_last_update + self._coordinator.refresh_interval)
@@ -5169,6 +6316,25 @@ class IUController(IUBase):
         self._switch.call_switch(state, stime)
         self._coordinator.status_changed(stime, self, None, state)
 
+    def report_state(self, stime: datetime) -> None:
+        """Report the state change to the history and statistics"""
+        attr = {}
+        if self._is_on:
+            if (run := self._run_queue.current_run) is not None:
+                attr[ATTR_CURRENT_NAME] = run.zone.name
+        else:
+            attr[ATTR_VOLUME] = self._volume.total
+            attr[ATTR_FLOW_RATE] = self._volume.flow_rate
+        self._coordinator.history.record(self.entity_id, stime, self._is_on, attr)
+        self._coordinator.statistics.record(
+            self.unique_id,
+            self.name,
+            stime,
+            self._is_on,
+            attr.get(ATTR_VOLUME),
+            self._volume.unit_of_measurement,
+        )
+
     def decode_sequence_id(
         self, stime: datetime, sequences: list | None
     ) -> list[int] | None:
@@ -6215,6 +7381,44 @@ class IULogger:
         """Warn the volume meter value is invalid"""
         self._format(level, "VOLUME_VALUE", stime, f"{value}")
 
+    def log_switch_call(
+        self,
+        domain: str,
+        service: str,
+        entities: list[str],
+        latency: float,
+        level=DEBUG,
+    ) -> None:
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+        """Log the time taken by a switch call"""
+        self._format(
+            level,
+            "SWITCH_CALL",
+            None,
+            f"service: {domain}.{service}, "
+            f"entity_id: {','.join(entities)}, "
+            f"latency: {latency:.3f}",
+        )
+
+    def log_switch_call_error(
+        self,
+        domain: str,
+        service: str,
+        entities: list[str],
+        error: Exception,
+        level=ERROR,
+    ) -> None:
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+        """Warn a switch call failed"""
+        self._format(
+            level,
+            "SWITCH_CALL",
+            None,
+            f"service: {domain}.{service}, "
+            f"entity_id: {','.join(entities)}, "
+            f"error: {str(error) or type(error).__name__}",
+        )
+
     def log_volume_reading(
         self,
         stime: datetime,
@@ -6223,7 +7427,7 @@ class IULogger:
         sensor_id: str,
         value: Decimal,
         total: Decimal,
-        flow_avg: Decimal,
+        flow_avg: float,
         level=DEBUG,
     ) -> None:
         # pylint: disable=too-many-arguments, too-many-positional-arguments
@@ -6241,6 +7445,32 @@ class IULogger:
             f"flow_avg: {flow_avg} ",
         )
 
+    def log_volume_summary(
+        self,
+        stime: datetime,
+        controller: IUController,
+        zone: IUZone,
+        sensor_id: str,
+        readings: int,
+        total: Decimal,
+        flow_avg: float,
+        level=DEBUG,
+    ) -> None:
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+        """Log the volume recorded over a run"""
+        idl = IUBase.idl([controller, zone], "-", 1)
+        self._format(
+            level,
+            "VOLUME_SUMMARY",
+            stime,
+            f"controller: {idl[0]}, "
+            f"zone: {idl[1]}, "
+            f"entity_id: {sensor_id}, "
+            f"readings: {readings}, "
+            f"total: {total}, "
+            f"flow_avg: {flow_avg} ",
+        )
+
 
 class IUClock:
     """Irrigation Unlimited Clock class"""
@@ -6465,10 +7695,19 @@ class IUCoordinator:
         self._last_muster: datetime = None
         self._muster_required: bool = False
         self._remove_shutdown_listener: CALLBACK_TYPE = None
+        self._remove_config_listener: CALLBACK_TYPE = None
         self._logger = IULogger(_LOGGER)
         self._tester = IUTester(self)
         self._clock = IUClock(self._hass, self, self._async_timer)
         self._history = IUHistory(self._hass, self.service_history)
+        self._meters = IUMeterHub(self._hass, self)
+        self._dispatcher = IUSwitchDispatcher(self._hass, self)
+        self._statistics = IUStatistics(self._hass)
+        self._astral = IUAstral(self._hass)
+        self._astral_events: tuple[set[str], timedelta] = None
+        self._deadlines = IUDeadlines()
+        self._sensor_day: int = None
+        self._dirty_entities: dict[Entity, None] = {}
         self._finalised = False
         self._muster_status: IURQStatus = IURQStatus.NONE
 
@@ -6510,6 +7749,31 @@ class IUCoordinator:
         """Return the history object"""
         return self._history
 
+    @property
+    def meters(self) -> IUMeterHub:
+        """Return the meter hub"""
+        return self._meters
+
+    @property
+    def dispatcher(self) -> IUSwitchDispatcher:
+        """Return the switch dispatcher"""
+        return self._dispatcher
+
+    @property
+    def statistics(self) -> IUStatistics:
+        """Return the long term statistics object"""
+        return self._statistics
+
+    @property
+    def astral(self) -> IUAstral:
+        """Return the astral event cache"""
+        return self._astral
+
+    @property
+    def deadlines(self) -> IUDeadlines:
+        """Return the wake up register"""
+        return self._deadlines
+
     @property
     def is_setup(self) -> bool:
         """Indicate if system is setup"""
@@ -6598,6 +7862,9 @@ class IUCoordinator:
     def load(self, config: OrderedDict) -> "IUCoordinator":
         """Load config data for the system"""
         self.clear()
+        self._astral.clear()
+        self._astral_events = None
+        self._deadlines.clear()
 
         global SYSTEM_GRANULARITY  # pylint: disable=global-statement
         SYSTEM_GRANULARITY = config.get(CONF_GRANULARITY, DEFAULT_GRANULARITY)
@@ -6627,6 +7894,8 @@ class IUCoordinator:
         self.request_update(False)
         self._logger.log_load(config)
         self._history.load(config, self._clock.is_fixed)
+        self._statistics.load(config)
+        self._dispatcher.load(config)
         self._global_sequence_ids = config.get(
             CONF_GLOBAL_SEQUENCE_IDS, self._global_sequence_ids
         )
@@ -6733,11 +8002,40 @@ class IUCoordinator:
 
         return {CONF_CONTROLLERS: [_controller(c) for c in self._controllers]}
 
+    def astral_changed(self) -> None:
+        """The schedules have changed. Gather the sun events again at the
+        next muster"""
+        self._astral_events = None
+        self._astral.refill()
+
+    def muster_astral(self, stime: datetime) -> None:
+        """Prime the astral cache with the events used by the schedules"""
+        if self._astral.is_filled(stime):
+            return
+        if self._astral_events is None:
+            events: set[str] = set()
+            span = TD_ZERO
+            for controller in self._controllers:
+                for zone in controller.zones:
+                    span = max(span, zone.runs.last_time(stime) - stime)
+                    events.update(sch.sun_event for sch in zone.schedules)
+                for sequence in controller.sequences:
+                    events.update(sch.sun_event for sch in sequence.schedules)
+            events.discard(None)
+            self._astral_events = (events, span)
+        self._astral.prefill(stime, *self._astral_events)
+
     def muster(self, stime: datetime, force: bool) -> IURQStatus:
         """Calculate run times for system"""
         status = IURQStatus(0)
 
-        self._history.muster(stime, force)
+        if self._history.muster(stime, force):
+            self._history.watch(
+                entity.entity_id
+                for controller in self._controllers
+                for entity in (controller, *controller.zones)
+            )
+        self.muster_astral(stime)
 
         for controller in self._controllers:
             status |= controller.muster(stime, force)
@@ -6824,14 +8122,44 @@ class IUCoordinator:
         """Update home assistant sensors if required"""
         stime = wash_dt(stime, 1)
         if deep:
+            for owner in self._deadlines.pop_due(stime):
+                owner.request_visit()
+            if (day := dt.as_local(stime).toordinal()) != self._sensor_day:
+                # Visit every zone once a day for the total_today attribute
+                self._sensor_day = day
+                for controller in self._controllers:
+                    for zone in controller.zones:
+                        zone.request_visit()
             for controller in self._controllers:
                 controller.update_sensor(stime)
 
         if self._component is not None and self._sensor_update_required:
-            self._component.schedule_update_ha_state()
+            self.schedule_entity_update(self._component)
             self._sensor_update_required = False
             self._sensor_last_update = stime
 
+        self.flush_entity_updates()
+
+    def schedule_entity_update(self, entity: Entity) -> None:
+        """Flag the entity for a state write in the next batch"""
+        self._dirty_entities[entity] = None
+
+    def flush_entity_updates(self) -> None:
+        """Write the state of all flagged entities as a single batch
+        on the event loop"""
+        if not self._dirty_entities:
+            return
+        entities = list(self._dirty_entities)
+        self._dirty_entities.clear()
+        self._hass.loop.call_soon_threadsafe(self._async_write_entities, entities)
+
+    @callback
+    def _async_write_entities(self, entities: list[Entity]) -> None:
+        """Batch writer for the entity states"""
+        for entity in entities:
+            if entity.hass is not None:
+                entity.async_write_ha_state()
+
     def poll(self, vtime: datetime, force: bool = False) -> None:
         """Poll the system for changes, updates and refreshes.
         vtime is the virtual time if in testing mode, if not then
@@ -6844,6 +8172,7 @@ class IUCoordinator:
                 self.check_run(wtime)
                 self._muster_status = IURQStatus.NONE
             self._last_muster = wtime
+        self._statistics.tick(wtime)
         self.update_sensor(vtime)
 
     def poll_main(self, atime: datetime, force: bool = False) -> None:
@@ -6878,6 +8207,9 @@ class IUCoordinator:
                 controller.finalise(turn_off)
             self._clock.finalise()
             self._history.finalise()
+            if self._remove_config_listener is not None:
+                self._remove_config_listener()
+                self._remove_config_listener = None
             self._finalised = True
 
     async def _async_shutdown_listener(self, event: HAEvent) -> None:
@@ -6896,6 +8228,26 @@ class IUCoordinator:
         self._remove_shutdown_listener = self._hass.bus.async_listen_once(
             EVENT_HOMEASSISTANT_STOP, self._async_shutdown_listener
         )
+        if self._remove_config_listener is None:
+            self._remove_config_listener = self._hass.bus.async_listen(
+                EVENT_CORE_CONFIG_UPDATE, self._async_config_listener
+            )
+
+    async def _async_config_listener(self, event: HAEvent) -> None:
+        """Home Assistant core configuration has changed. If the location
+        has moved then drop the astral cache and the queued schedules so
+        they are rebuilt with the new sun times"""
+        if event.data.keys().isdisjoint(
+            (CONF_LATITUDE, CONF_LONGITUDE, CONF_ELEVATION)
+        ):
+            return
+        self._astral.clear()
+        for controller in self._controllers:
+            for sequence in controller.sequences:
+                sequence.runs.clear_runs()
+            for zone in controller.zones:
+                zone.runs.clear_runs()
+        self._update_all(self.service_time())
 
     def _update_all(self, atime: datetime) -> None:
         """Force an update from the top. Simulates a clock tick. Used before and
@@ -6918,7 +8270,7 @@ class IUCoordinator:
 
     def next_awakening(self) -> datetime:
         """Return the next event time"""
-        return IUDTMin(ctr.next_awakening() for ctr in self._controllers).min
+        return self._deadlines.min
 
     def check_switches(self, resync: bool, stime: datetime) -> list[str]:
         """Check if entities match current status"""
@@ -7003,9 +8355,10 @@ class IUCoordinator:
         entity_id: str | list[str],
         controller: IUController,
         zone: IUZone,
+        event_type: str = None,
     ) -> None:
         """Send out notification about valve event. Reason 1=on/off, 2=sync
-        3=run change"""
+        3=run change, 4=target volume, 5=high flow, 6=low flow"""
         # pylint: disable=too-many-arguments, too-many-positional-arguments
         # pylint: disable=too-many-locals
 
@@ -7013,7 +8366,8 @@ class IUCoordinator:
             data[ATTR_ENTITY_ID] = entity
             self._hass.bus.fire(f"{DOMAIN}_{event_type}", data)
 
-        event_type = EVENT_VALVE_ON if state else EVENT_VALVE_OFF
+        if event_type is None:
+            event_type = EVENT_VALVE_ON if state else EVENT_VALVE_OFF
 
         duration = TD_ZERO
         volume: float
@@ -7243,7 +8597,8 @@ class IUCoordinator:
                 changed = controller.service_resume(data1, stime)
         elif service == SERVICE_LOAD_SCHEDULE:
             render_positive_time_period(data1, CONF_DURATION)
-            changed = self.service_load_schedule(data1)
+            if changed := self.service_load_schedule(data1):
+                self.astral_changed()
         else:
             return None
 
@@ -7266,6 +8621,7 @@ class IUCoordinator:
             for zone in controller.zones:
                 if zone.entity_id in entity_ids:
                     zone.schedule_update(stime)
+        self.flush_entity_updates()
 
     def start_test(self, test_no: int) -> datetime:
         """Main entry to start a test"""
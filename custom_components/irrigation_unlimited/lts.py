@@ -0,0 +1,262 @@
+"""Long term statistics. This module aggregates the run transitions into
+hourly runtime and volume totals and pushes them to the recorder as external
+statistics. The volume of a run is only known when it finishes so the whole
+amount is credited to the hour the run ends in"""
+
+from datetime import datetime, timedelta, timezone
+from typing import OrderedDict, NamedTuple
+from homeassistant.core import HomeAssistant
+from homeassistant.const import UnitOfTime
+from homeassistant.util.unit_conversion import VolumeConverter
+
+try:
+    from homeassistant.helpers.recorder import DATA_INSTANCE
+except ImportError:
+    from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+
+try:
+    from homeassistant.components.recorder.models import StatisticMeanType
+except ImportError:
+    StatisticMeanType = None
+
+from .const import (
+    CONF_HISTORY,
+    CONF_STATISTICS,
+    DOMAIN,
+)
+
+ONE_HOUR = timedelta(hours=1)
+
+
+def hour_start(stime: datetime) -> datetime:
+    """Return the start of the hour"""
+    return stime.replace(minute=0, second=0, microsecond=0)
+
+
+class IUStatisticsHour(NamedTuple):
+    """Class to hold the totals for a completed hour"""
+
+    start: datetime
+    runtime: float
+    volume: float
+
+
+class IUStatisticsTracker:
+    """Accumulate the runtime and volume of a zone, sequence or controller
+    into hourly buckets"""
+
+    def __init__(self, unique_id: str, name: str) -> None:
+        # Passed parameters
+        self.unique_id = unique_id
+        self.name = name
+        self.unit: str = None
+        # Private variables
+        self._hour: datetime = None
+        self._on_since: datetime = None
+        self._runtime: float = 0.0
+        self._volume: float = None
+        self._hours: list[IUStatisticsHour] = []
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if a run is in progress"""
+        return self._on_since is not None
+
+    def _close(self, end: datetime) -> None:
+        """Add the time on since the start of the hour up to end"""
+        if self._on_since is not None:
+            self._runtime += (end - max(self._on_since, self._hour)).total_seconds()
+
+    def roll(self, stime: datetime) -> None:
+        """Close off the hours ended before stime"""
+        if self._hour is None:
+            self._hour = hour_start(stime)
+            return
+        while stime >= (end := self._hour + ONE_HOUR):
+            self._close(end)
+            if self._runtime > 0 or self._volume is not None:
+                self._hours.append(
+                    IUStatisticsHour(self._hour, self._runtime, self._volume)
+                )
+            self._runtime = 0.0
+            self._volume = None
+            self._hour = end
+            if self._on_since is None:
+                # Nothing to carry over, jump the idle hours
+                self._hour = hour_start(stime)
+                break
+
+    def update(self, stime: datetime, is_on: bool, volume: float) -> None:
+        """Record a transition. The volume is that of the run just finished
+        and is added to the current hour"""
+        self.roll(stime)
+        if is_on:
+            if self._on_since is None:
+                self._on_since = stime
+        elif self._on_since is not None:
+            self._close(stime)
+            self._on_since = None
+            if volume is not None:
+                self._volume = (self._volume or 0.0) + volume
+
+    def pop(self) -> list[IUStatisticsHour]:
+        """Remove and return the completed hours"""
+        result = self._hours
+        self._hours = []
+        return result
+
+
+class IUStatistics:
+    """Irrigation Unlimited long term statistics class"""
+
+    RUNTIME = "runtime"
+    VOLUME = "volume"
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        # Passed parameters
+        self._hass = hass
+        # Config parameters
+        self._enabled = False
+        # Private variables
+        self._trackers: dict[str, IUStatisticsTracker] = {}
+        self._sums: dict[str, tuple[datetime, float]] = {}
+        self._next_hour: datetime = None
+        self._pending = False
+
+    @property
+    def enabled(self) -> bool:
+        """Return True if statistics are exported"""
+        return self._enabled
+
+    @staticmethod
+    def statistic_id(unique_id: str, kind: str) -> str:
+        """Return the external statistic id"""
+        return f"{DOMAIN}:{unique_id}_{kind}"
+
+    def tracker(self, unique_id: str) -> IUStatisticsTracker:
+        """Return the tracker for the entity"""
+        return self._trackers.get(unique_id)
+
+    def record(
+        self,
+        unique_id: str,
+        name: str,
+        stime: datetime,
+        is_on: bool,
+        volume: float = None,
+        unit: str = None,
+    ) -> None:
+        """Report an on/off transition. unit is that of the volume"""
+        if not self._enabled:
+            return
+        if (tracker := self._trackers.get(unique_id)) is None:
+            tracker = self._trackers[unique_id] = IUStatisticsTracker(
+                unique_id, name
+            )
+        tracker.name = name
+        if unit is not None:
+            tracker.unit = unit
+        tracker.update(stime, is_on, volume)
+        if self._next_hour is None:
+            self._next_hour = hour_start(stime) + ONE_HOUR
+
+    def tick(self, stime: datetime) -> None:
+        """Close off the completed hours. Nothing is done until the hour
+        has ended"""
+        if self._next_hour is None or stime < self._next_hour:
+            return
+        self._next_hour = hour_start(stime) + ONE_HOUR
+        for tracker in self._trackers.values():
+            tracker.roll(stime)
+        if not self._pending and DATA_INSTANCE in self._hass.data:
+            self._pending = True
+            self._hass.async_create_task(self._async_export())
+
+    def _metadata(
+        self, tracker: IUStatisticsTracker, kind: str
+    ) -> StatisticMetaData:
+        """Return the metadata for the statistic"""
+        metadata = {
+            "source": DOMAIN,
+            "statistic_id": self.statistic_id(tracker.unique_id, kind),
+            "name": f"{tracker.name} {kind}",
+            "has_sum": True,
+        }
+        if kind == self.RUNTIME:
+            metadata["unit_of_measurement"] = UnitOfTime.MINUTES
+            metadata["unit_class"] = "duration"
+        else:
+            metadata["unit_of_measurement"] = tracker.unit
+            metadata["unit_class"] = (
+                VolumeConverter.UNIT_CLASS
+                if tracker.unit in VolumeConverter.VALID_UNITS
+                else None
+            )
+        if StatisticMeanType is not None:
+            metadata["mean_type"] = StatisticMeanType.NONE
+        else:
+            metadata["has_mean"] = False
+        return metadata
+
+    async def _async_last_sum(self, statistic_id: str) -> tuple[datetime, float]:
+        """Return the start and sum of the last exported hour"""
+        if (result := self._sums.get(statistic_id)) is not None:
+            return result
+        last = await get_instance(self._hass).async_add_executor_job(
+            get_last_statistics, self._hass, 1, statistic_id, True, {"sum"}
+        )
+        result = (None, 0.0)
+        if statistic_id in last:
+            row = last[statistic_id][0]
+            start = row["start"]
+            if not isinstance(start, datetime):
+                start = datetime.fromtimestamp(start, timezone.utc)
+            result = (start, row.get("sum") or 0.0)
+        return result
+
+    async def _async_export(self) -> None:
+        """Push the completed hours to the recorder"""
+        self._pending = False
+        for tracker in self._trackers.values():
+            if not (hours := tracker.pop()):
+                continue
+            for kind in (self.RUNTIME, self.VOLUME):
+                statistic_id = self.statistic_id(tracker.unique_id, kind)
+                last_start, total = await self._async_last_sum(statistic_id)
+                rows: list[StatisticData] = []
+                for hour in hours:
+                    if kind == self.RUNTIME:
+                        value = round(hour.runtime / 60, 2)
+                    else:
+                        value = hour.volume
+                    if value is None or (
+                        last_start is not None and hour.start <= last_start
+                    ):
+                        continue
+                    total += value
+                    last_start = hour.start
+                    rows.append({"start": hour.start, "state": value, "sum": total})
+                self._sums[statistic_id] = (last_start, total)
+                if rows:
+                    async_add_external_statistics(
+                        self._hass, self._metadata(tracker, kind), rows
+                    )
+
+    def load(self, config: OrderedDict) -> "IUStatistics":
+        """Load config data"""
+        if config is None:
+            config = {}
+        if CONF_HISTORY in config:
+            self._enabled = config[CONF_HISTORY].get(CONF_STATISTICS, self._enabled)
+        self._trackers.clear()
+        self._next_hour = None
+        return self
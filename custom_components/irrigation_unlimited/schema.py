@@ -24,6 +24,8 @@ from .const import (
     CONF_CHAINS,
     CONF_CHECK_BACK,
     CONF_CLOCK,
+    CONF_COMMAND_QUEUE,
+    CONF_CONCURRENCY,
     CONF_CONFIG,
     CONF_CONTROLLERS,
     CONF_CONTROLLER_ID,
@@ -40,8 +42,11 @@ from .const import (
     CONF_EXTENDED_CONFIG,
     CONF_FINISH,
     CONF_FIXED,
+    CONF_FLOW_ACTION,
     CONF_FLOW_RATE_PRECISION,
     CONF_FLOW_RATE_SCALE,
+    CONF_FLOW_RATE_WINDOW,
+    CONF_FLOW_TOLERANCE,
     CONF_FROM,
     CONF_FUTURE_SPAN,
     CONF_GLOBAL_SEQUENCE_IDS,
@@ -51,11 +56,16 @@ from .const import (
     CONF_HISTORY_REFRESH,
     CONF_HISTORY_SPAN,
     CONF_INCREASE,
+    CONF_INTEGRATIONS,
+    CONF_LIVE,
     CONF_MAXIMUM,
+    CONF_LOG_SUMMARY,
     CONF_MAX_LOG_ENTRIES,
     CONF_MINIMUM,
     CONF_MODE,
     CONF_MONTH,
+    CONF_NOTIFY,
+    CONF_NOTIFY_INTERVAL,
     CONF_ODD,
     CONF_OUTPUT_EVENTS,
     CONF_PAUSE_NEXT,
@@ -81,7 +91,9 @@ from .const import (
     CONF_SHOW_CONFIG,
     CONF_SHOW_LOG,
     CONF_SHOW_SEQUENCE_STATUS,
+    CONF_SPACING,
     CONF_SPAN,
+    CONF_STATISTICS,
     CONF_SPEED,
     CONF_START,
     CONF_START_N_DAYS,
@@ -90,6 +102,7 @@ from .const import (
     CONF_STATE_ON,
     CONF_SUN,
     CONF_SYNC_SWITCHES,
+    CONF_TARGET,
     CONF_TESTING,
     CONF_THRESHOLD,
     CONF_TIME,
@@ -103,6 +116,7 @@ from .const import (
     CONF_ZONES,
     CONF_ZONE_ID,
     MONTHS,
+    SERVICE_CANCEL,
 )
 
 IU_ID = r"^[a-z0-9]+(_[a-z0-9]+)*$"
@@ -235,6 +249,14 @@ VOLUME_SCHEMA = vol.Schema(
         vol.Optional(CONF_VOLUME_SCALE): cv.positive_float,
         vol.Optional(CONF_FLOW_RATE_PRECISION): cv.positive_int,
         vol.Optional(CONF_FLOW_RATE_SCALE): cv.positive_float,
+        vol.Optional(CONF_FLOW_RATE_WINDOW): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+        vol.Optional(CONF_NOTIFY_INTERVAL): cv.positive_int,
+        vol.Optional(CONF_LOG_SUMMARY): cv.boolean,
+        vol.Optional(CONF_TARGET): cv.positive_float,
+        vol.Optional(CONF_FLOW_TOLERANCE): cv.positive_float,
+        vol.Optional(CONF_FLOW_ACTION): vol.Any(CONF_NOTIFY, SERVICE_CANCEL),
     }
 )
 
@@ -334,6 +356,8 @@ HISTORY_SCHEMA = vol.Schema(
         vol.Optional(CONF_REFRESH_INTERVAL): cv.positive_int,
         vol.Optional(CONF_SPAN): cv.positive_int,
         vol.Optional(CONF_READ_DELAY): cv.positive_int,
+        vol.Optional(CONF_LIVE): cv.boolean,
+        vol.Optional(CONF_STATISTICS): cv.boolean,
     }
 )
 
@@ -347,6 +371,14 @@ CLOCK_SCHEMA = vol.Schema(
     }
 )
 
+COMMAND_QUEUE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_CONCURRENCY): cv.positive_int,
+        vol.Optional(CONF_SPACING): cv.positive_float,
+        vol.Optional(CONF_INTEGRATIONS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
 TEST_RESULT_SCHEMA = vol.Schema(
     {
         vol.Required("t"): cv.datetime,
@@ -390,6 +422,7 @@ IRRIGATION_SCHEMA = vol.Schema(
         vol.Optional(CONF_TESTING): TEST_SCHEMA,
         vol.Optional(CONF_HISTORY): HISTORY_SCHEMA,
         vol.Optional(CONF_CLOCK): CLOCK_SCHEMA,
+        vol.Optional(CONF_COMMAND_QUEUE): COMMAND_QUEUE_SCHEMA,
         vol.Optional(CONF_EXTENDED_CONFIG): cv.boolean,
         vol.Optional(CONF_RESTORE_FROM_ENTITY): cv.boolean,
         vol.Optional(CONF_SHOW_CONFIG): cv.boolean,
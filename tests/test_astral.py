@@ -0,0 +1,61 @@
+"""Test irrigation_unlimited astral event cache"""
+# pylint: disable=unused-import
+from unittest.mock import patch, PropertyMock
+import homeassistant.core as ha
+from homeassistant.helpers import sun
+from custom_components.irrigation_unlimited.irrigation_unlimited import IUZone
+from tests.iu_test_support import IUExam
+
+IUExam.quiet_mode()
+
+
+async def test_astral_cache(
+    hass: ha.HomeAssistant, skip_setup, skip_dependencies, skip_history
+):
+    """Test the astral events are calculated once per day"""
+    # pylint: disable=unused-argument, protected-access
+
+    with patch(
+        "homeassistant.helpers.sun.get_astral_event_date",
+        wraps=sun.get_astral_event_date,
+    ) as mock:
+        async with IUExam(hass, "timing_astral.yaml") as exam:
+            await exam.begin_test(1)
+            await exam.run_until("2021-12-22 12:00")
+
+            assert mock.call_count > 0
+            event, day = mock.call_args.args[1:3]
+
+            # Cached events are not recalculated
+            count = mock.call_count
+            exam.coordinator.astral.get(event, day)
+            assert mock.call_count == count
+
+            # A filled day does not walk the schedules
+            with patch.object(
+                IUZone, "schedules", new_callable=PropertyMock
+            ) as schedules:
+                exam.coordinator.muster_astral(exam.virtual_time)
+                assert schedules.call_count == 0
+
+            await exam.finish_test()
+            await exam.run_test(2)
+            exam.check_summary()
+
+            # Other configuration changes leave the cache alone
+            count = mock.call_count
+            await hass.config.async_update(currency="AUD")
+            await hass.async_block_till_done()
+            exam.coordinator.astral.get(event, day)
+            assert mock.call_count == count
+
+            # Location change drops the cache and rebuilds the schedules
+            with patch.object(
+                exam.coordinator, "_update_all", wraps=exam.coordinator._update_all
+            ) as update_all:
+                await hass.config.async_update(latitude=-33.865143, longitude=151.2099)
+                await hass.async_block_till_done()
+                assert update_all.call_count == 1
+            count = mock.call_count
+            exam.coordinator.astral.get(event, day)
+            assert mock.call_count == count + 1
@@ -18,8 +18,10 @@ async def test_cron(hass: ha.HomeAssistant, skip_history):
         await exam.run_all()
         exam.check_summary()
 
-    async with IUExam(hass, "test_cron_error.yaml") as exam:
-        with patch.object(IULogger, "_format") as mock:
+    with patch.object(IULogger, "_format") as mock:
+        async with IUExam(hass, "test_cron_error.yaml") as exam:
+            # Invalid expressions are reported once when loaded
+            assert sum(1 for call in mock.call_args_list if call.args[1] == "CRON") == 2
             await exam.run_all()
             exam.check_summary()
 
@@ -1,5 +1,7 @@
 """Test irrigation_unlimited entity operations."""
 from datetime import timedelta
+from unittest.mock import patch
+import re
 import homeassistant.core as ha
 from homeassistant.const import (
     ATTR_FRIENDLY_NAME,
@@ -472,3 +474,46 @@ async def test_entity_rename(hass: ha.HomeAssistant, skip_dependencies, skip_his
             hass.states.get("binary_sensor.irrigation_unlimited_my_garden_front_lawn")
             is not None
         )
+
+
+async def test_entity_write_order(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test the entity states are written as one batch per tick. The
+    controller is written before its zones and sequences so a zone is
+    never seen on while the controller is off."""
+    # pylint: disable=unused-argument
+
+    def rank(entity_id: str) -> int:
+        """Order of the entities in a batch"""
+        for i, pattern in enumerate([r"_c\d+_m$", r"_z\d+$", r"_s\d+$"]):
+            if re.search(pattern, entity_id):
+                return i
+        return 3
+
+    async with IUExam(hass, "test_sequence_queue.yaml") as exam:
+        master = "binary_sensor.irrigation_unlimited_c1_m"
+        seen: list[str] = []
+
+        def handle_state_change(event: ha.Event) -> None:
+            entity_id = event.data["entity_id"]
+            if entity_id != master and event.data["new_state"].state == STATE_ON:
+                seen.append(entity_id)
+                assert hass.states.is_state(master, STATE_ON), entity_id
+
+        hass.bus.async_listen("state_changed", handle_state_change)
+
+        coordinator = exam.coordinator
+        with patch.object(
+            coordinator,
+            "_async_write_entities",
+            wraps=coordinator._async_write_entities,  # pylint: disable=protected-access
+        ) as mock:
+            await exam.run_test(1)
+        assert "binary_sensor.irrigation_unlimited_c1_z1" in seen
+        assert "binary_sensor.irrigation_unlimited_c1_s1" in seen
+        assert mock.call_count > 0
+        for call in mock.call_args_list:
+            ranks = [rank(entity.entity_id) for entity in call.args[0]]
+            assert ranks == sorted(ranks)
+            assert len(ranks) == len(set(call.args[0]))
@@ -1,6 +1,9 @@
 """Test irrigation_unlimited history."""
 
 # pylint: disable=too-many-lines
+import copy
+import json
+import tracemalloc
 from unittest.mock import patch
 from datetime import datetime, timedelta
 from collections import Counter
@@ -16,6 +19,10 @@ from custom_components.irrigation_unlimited.const import (
     SERVICE_MANUAL_RUN,
 )
 from custom_components.irrigation_unlimited.history import (
+    IUHistory,
+    IUHistoryCursor,
+    IUTagTable,
+    IUTimeline,
     midnight,
     round_seconds_dt,
     round_seconds_td,
@@ -157,6 +164,112 @@ async def test_history_routines():
     ) == dt.as_local(datetime(2021, 1, 4))
 
 
+async def test_history_timeline():
+    """Test out the columnar timeline store and totals"""
+    tags = IUTagTable()
+    timeline = IUTimeline(tags)
+    start = mk_utc("2021-06-01 00:00")
+    records = [
+        {
+            "start": start + timedelta(minutes=i * 10),
+            "end": start + timedelta(minutes=i * 10 + 5),
+            "schedule": i % 3,
+            "schedule_name": f"Schedule {i % 3}",
+            "adjustment": "",
+            "volume": None if i % 2 else i / 4,
+            "flow_rate": None if i % 2 else 1.5,
+        }
+        for i in range(1000)
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for record in records:
+        timeline.append(record)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert used / len(records) < 96
+    assert len(tags) == 3
+
+    assert len(timeline) == 1000
+    assert timeline.item(1) == records[1]
+    assert timeline.as_list() == records
+
+    # A rebuilt timeline compares equal, missing values included
+    other = IUTimeline(tags)
+    for record in records:
+        other.append(record)
+    assert other == timeline
+    other.append(records[0])
+    assert other != timeline
+
+    # Trim drops the runs that finished before the window
+    assert timeline.trim(records[10]["start"]) == 10
+    assert timeline.trim(records[10]["start"]) == 0
+    assert timeline.as_list() == records[10:]
+
+    # Totals are looked up from the running sums
+    assert timeline.total(start) == (timedelta(minutes=5 * 990), 62370.0)
+    assert timeline.total(records[10]["start"], records[20]["start"]) == (
+        timedelta(minutes=50),
+        17.5,
+    )
+    assert timeline.total(records[11]["start"], records[12]["start"]) == (
+        timedelta(minutes=5),
+        None,
+    )
+    assert timeline.total(records[999]["end"]) == (timedelta(0), None)
+
+
+async def test_history_span_totals(hass: ha.HomeAssistant):
+    """Test the totals do not reach back past the history span"""
+    # pylint: disable=protected-access
+
+    history = IUHistory(hass, lambda entity_ids: None)
+    history.load({"history": {"span": 2}}, True)
+    stime = mk_utc("2021-01-04 06:00")
+    history._stime = stime
+    cursor = IUHistoryCursor(history._tags)
+    for start in [stime - timedelta(days=2, minutes=5), stime - timedelta(hours=12)]:
+        cursor.timeline.append(
+            {
+                "start": start,
+                "end": start + timedelta(minutes=10),
+                "schedule": 1,
+                "schedule_name": "Schedule 1",
+                "adjustment": "",
+                "volume": None,
+                "flow_rate": None,
+            }
+        )
+    history._refresh_cache(stime, {"binary_sensor.irrigation_unlimited_c1_z1": cursor})
+    # The run that started before the span is left out
+    totals = history.last_7d_total("binary_sensor.irrigation_unlimited_c1_z1")
+    assert totals.duration == timedelta(minutes=10)
+    totals = history.last_24h_total("binary_sensor.irrigation_unlimited_c1_z1")
+    assert totals.duration == timedelta(minutes=10)
+
+
+async def test_history_projection():
+    """Test the recorder states are cut down to the attributes used"""
+    state = ha.State(
+        "binary_sensor.irrigation_unlimited_c1_z1",
+        "off",
+        {
+            "timeline": [{"start": mk_utc("2021-01-04 06:05")}] * 100,
+            "configuration": "{}",
+            "volume": 1.5,
+            "flow_rate": 3.0,
+        },
+        mk_utc("2021-01-04 06:15"),
+    )
+    assert IUHistory._project(state) == (
+        "off",
+        {"volume": 1.5, "flow_rate": 3.0},
+        mk_utc("2021-01-04 06:15"),
+    )
+
+
 async def test_history_main(hass: ha.HomeAssistant, allow_memory_db):
     """Test out the history caching and timeline"""
     # pylint: disable=redefined-outer-name
@@ -172,9 +285,15 @@ async def test_history_main(hass: ha.HomeAssistant, allow_memory_db):
             await exam.run_until("2021-01-04 06:02")
             await hass.async_block_till_done()
 
-            assert mock.call_count == 1
+            # One full read made in day sized chunks
+            assert mock.call_count == 7
             state = hass.states.get("binary_sensor.irrigation_unlimited_c1_z1")
             assert state.attributes["today_total"] == 4.0
+            assert state.attributes["last_24h_total"] >= 4.0
+            assert (
+                state.attributes["last_7d_total"]
+                >= state.attributes["last_24h_total"]
+            )
             timeline = [
                 {
                     "start": mk_utc("2021-01-06 06:05"),
@@ -521,6 +640,48 @@ async def test_history_main(hass: ha.HomeAssistant, allow_memory_db):
             exam.check_summary()
 
 
+async def test_history_feed(hass: ha.HomeAssistant, allow_memory_db):
+    """Test out the history fed directly from the zone transitions"""
+    # pylint: disable=redefined-outer-name
+
+    async with IUExam(hass, "test_history_feed.yaml", True) as exam:
+
+        with patch(
+            "homeassistant.components.recorder.history.get_significant_states"
+        ) as mock:
+            mock.side_effect = hist_data
+
+            await exam.begin_test(1)
+            await exam.run_until("2021-01-04 06:02")
+            await hass.async_block_till_done()
+
+            assert mock.call_count == 7
+            state = hass.states.get("binary_sensor.irrigation_unlimited_c1_z1")
+            today_total = state.attributes["today_total"]
+
+            # The run shows up as soon as the zone turns off
+            await exam.run_until("2021-01-04 06:16")
+            await hass.async_block_till_done()
+            state = hass.states.get("binary_sensor.irrigation_unlimited_c1_z1")
+            assert state.attributes["today_total"] == today_total + 10.0
+            assert {
+                "start": mk_local("2021-01-04 06:05"),
+                "end": mk_local("2021-01-04 06:15"),
+                "schedule": 1,
+                "schedule_name": "Schedule 1",
+                "adjustment": "",
+                "status": "history",
+                "volume": None,
+                "flow_rate": None,
+            } in state.attributes["timeline"]
+
+            await exam.finish_test()
+            exam.check_summary()
+
+            # The recorder was only read to seed the cache
+            assert mock.call_count == 7
+
+
 async def test_history_disabled(hass: ha.HomeAssistant, allow_memory_db):
     """Test out the history caching and timeline when disabled"""
     # pylint: disable=redefined-outer-name
@@ -607,7 +768,14 @@ async def test_history_object(hass: ha.HomeAssistant, allow_memory_db):
                 assert not entity_updates
 
                 # Examine cache contents
-                assert exam.coordinator.history._cache == {
+                cache = {
+                    entity_id: {
+                        "timeline": item["timeline"].as_list(),
+                        "today_on": item["today_on"],
+                    }
+                    for entity_id, item in exam.coordinator.history._cache.items()
+                }
+                assert cache == {
                     "binary_sensor.irrigation_unlimited_c1_m": {
                         "timeline": [
                             {
@@ -713,6 +881,221 @@ async def test_history_object(hass: ha.HomeAssistant, allow_memory_db):
                 exam.coordinator.history._callback = callback_save
 
 
+async def test_history_incremental(hass: ha.HomeAssistant, allow_memory_db):
+    """Test the history is read incrementally between full reads"""
+    # pylint: disable=redefined-outer-name
+    # pylint: disable=protected-access
+
+    async with IUExam(hass, "test_skeleton.yaml", True) as exam:
+        hist = exam.coordinator.history
+        hist.load({"history": {"enabled": False}}, True)
+
+        with patch(
+            "homeassistant.components.recorder.history.get_significant_states"
+        ) as mock:
+            mock.side_effect = hist_data
+
+            # First read covers the whole span in day sized chunks. Each
+            # chunk is folded in before the next is read
+            advance = hist._advance
+            reads: list[int] = []
+
+            def fold(cursor, states):
+                reads.append(mock.call_count)
+                advance(cursor, states)
+
+            stime = mk_utc("2021-06-04 04:12:00")
+            hist.muster(stime, True)
+            with patch.object(hist, "_advance", side_effect=fold):
+                await hist._async_update_history(stime)
+            assert mock.call_count == 7
+            assert reads == sorted(reads) and reads[0] < 7
+            assert mock.call_args_list[0].args[1] == stime - timedelta(days=7)
+            assert mock.call_args_list[0].args[5] is True
+            assert mock.call_args_list[1].args[1] == (
+                stime - timedelta(days=6) - IUHistory.DELTA_OVERLAP
+            )
+            assert mock.call_args.args[2] == stime
+            assert mock.call_args.args[5] is False
+
+            # Subsequent reads only ask for the delta
+            mock.reset_mock()
+            stime = mk_utc("2021-06-04 04:32:00")
+            hist.muster(stime, False)
+            await hist._async_update_history(stime)
+            assert mock.call_count == 1
+            assert mock.call_args.args[1] == mk_utc("2021-06-04 04:11:30")
+            assert mock.call_args.args[5] is False
+            cache = copy.deepcopy(hist._cache)
+
+            # The result matches a full read
+            mock.reset_mock()
+            hist.muster(stime, True)
+            await hist._async_update_history(stime)
+            assert mock.call_args_list[0].args[5] is True
+            assert hist._cache == cache
+
+            # A new day forces a full read
+            mock.reset_mock()
+            stime = mk_utc("2021-06-05 04:12:00")
+            hist.muster(stime, False)
+            await hist._async_update_history(stime)
+            assert mock.call_args_list[0].args[5] is True
+
+
+async def test_history_watch(hass: ha.HomeAssistant, allow_memory_db):
+    """Test quiet watched entities are not read and unchanged entities
+    are not reported"""
+    # pylint: disable=redefined-outer-name
+    # pylint: disable=protected-access
+
+    entity_updates: list[str] = []
+
+    def service_history(entity_ids: set[str]) -> None:
+        entity_updates.extend(entity_ids)
+
+    idm = "binary_sensor.irrigation_unlimited_c1_m"
+    idz1 = "binary_sensor.irrigation_unlimited_c1_z1"
+
+    async with IUExam(hass, "test_skeleton.yaml", True):
+        hist = IUHistory(hass, service_history)
+        hist.load({"history": {"enabled": False}}, True)
+
+        with patch(
+            "homeassistant.components.recorder.history.get_significant_states"
+        ) as mock:
+            mock.side_effect = hist_data
+
+            # A full read covers all the entities
+            stime = mk_utc("2021-06-04 04:17:00")
+            assert hist.muster(stime, True) is True
+            hist.watch([idm, idz1, None])
+            await hist._async_update_history(stime)
+            assert set(mock.call_args.args[3]) == {idm, idz1}
+            assert Counter(entity_updates) == Counter([idm, idz1])
+            version = hist._cursors[idz1].timeline.version
+
+            # Nothing has turned on or off so nothing is read
+            mock.reset_mock()
+            entity_updates.clear()
+            stime = mk_utc("2021-06-04 04:18:00")
+            assert hist.muster(stime, False) is False
+            await hist._async_update_history(stime)
+            assert mock.call_count == 0
+            assert not entity_updates
+
+            # Only the entity that changed is read
+            hist.record(idz1, mk_utc("2021-06-04 04:20:00"), True, {})
+            stime = mk_utc("2021-06-04 04:21:00")
+            hist.muster(stime, False)
+            await hist._async_update_history(stime)
+            assert mock.call_count == 1
+            assert mock.call_args.args[1] == mk_utc("2021-06-04 04:17:30")
+            assert mock.call_args.args[3] == [idz1]
+            assert idz1 in entity_updates
+            assert hist._cursors[idz1].timeline.version == version
+
+            # The completed run bumps the version
+            hist.record(idz1, mk_utc("2021-06-04 04:25:00"), False, {})
+            stime = mk_utc("2021-06-04 04:26:00")
+            hist.muster(stime, False)
+            await hist._async_update_history(stime)
+            assert mock.call_args.args[3] == [idz1]
+            assert hist._cursors[idz1].timeline.version == version + 1
+
+        hist.finalise()
+
+
+async def test_history_snapshot(hass: ha.HomeAssistant, allow_memory_db):
+    """Test the history cache is saved and picked up at startup"""
+    # pylint: disable=redefined-outer-name
+    # pylint: disable=protected-access
+
+    def service_history(entity_ids: set[str]) -> None:
+        pass
+
+    def down_data(hass, start_time, end_time, entity_ids, *args):
+        """Turn the zone off while the snapshot is sitting on disk"""
+        result = hist_data(hass, start_time, end_time, entity_ids, *args)
+        atime = mk_utc("2021-06-04 04:40:00")
+        if idz1 in entity_ids and start_time <= atime <= end_time:
+            result.setdefault(idz1, []).append(ha.State(idz1, STATE_OFF, {}, atime))
+        return result
+
+    idm = "binary_sensor.irrigation_unlimited_c1_m"
+    idz1 = "binary_sensor.irrigation_unlimited_c1_z1"
+
+    async with IUExam(hass, "test_skeleton.yaml", True):
+        stime = mk_utc("2021-06-04 04:32:00")
+        hist = IUHistory(hass, service_history)
+        hist.load({"history": {"enabled": False}}, True)
+        restored = IUHistory(hass, service_history)
+        restored.load({"history": {"enabled": False}}, True)
+
+        with patch(
+            "homeassistant.components.recorder.history.get_significant_states"
+        ) as mock:
+            mock.side_effect = hist_data
+
+            # No snapshot so a full read is done
+            hist.muster(stime, True)
+            with patch.object(hist._store, "async_load", return_value=None):
+                await hist._async_update_history(stime)
+            assert mock.call_args_list[0].args[5] is True
+            snapshot = json.loads(json.dumps(hist._snapshot()))
+            assert snapshot["cursors"][idz1]["front"] is not None
+
+            # Startup with a snapshot only reads the delta
+            mock.reset_mock()
+            restored.muster(stime, True)
+            with patch.object(restored._store, "async_load", return_value=snapshot):
+                await restored._async_update_history(stime)
+            assert mock.call_count == 1
+            assert mock.call_args.args[1] == stime - IUHistory.DELTA_OVERLAP
+            assert mock.call_args.args[5] is False
+            assert restored._cache == hist._cache
+
+            # The snapshot is only used once
+            mock.reset_mock()
+            restored.muster(stime, True)
+            await restored._async_update_history(stime)
+            assert mock.call_args_list[0].args[5] is True
+            assert restored._cache == hist._cache
+
+            # Watched entities are read after a restart as they may have
+            # changed while down. The open run is closed
+            mock.reset_mock()
+            mock.side_effect = down_data
+            stime = mk_utc("2021-06-04 04:45:00")
+            rebooted = IUHistory(hass, service_history)
+            rebooted.load({"history": {"enabled": False}}, True)
+            rebooted.muster(stime, True)
+            rebooted.watch([idm, idz1])
+            with patch.object(rebooted._store, "async_load", return_value=snapshot):
+                await rebooted._async_update_history(stime)
+            assert mock.call_count == 1
+            assert mock.call_args.args[5] is False
+            assert set(mock.call_args.args[3]) == {idm, idz1}
+            assert rebooted._cursors[idz1].front is None
+            assert rebooted.today_total_duration(idz1) == timedelta(minutes=20)
+
+            # Only the first delta reads the quiet entities
+            mock.reset_mock()
+            stime = mk_utc("2021-06-04 04:50:00")
+            rebooted.muster(stime, False)
+            await rebooted._async_update_history(stime)
+            assert mock.call_count == 0
+            assert rebooted.today_total_duration(idz1) == timedelta(minutes=20)
+
+            # A save pending across a reload writes nothing
+            rebooted._clear_cursors()
+            assert rebooted._snapshot() is None
+
+        hist.finalise()
+        restored.finalise()
+        rebooted.finalise()
+
+
 async def test_history_live(hass: ha.HomeAssistant, allow_memory_db):
     """Test out the IUHistory object"""
 
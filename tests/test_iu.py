@@ -2,6 +2,7 @@
 
 import datetime
 import json
+from unittest.mock import patch
 import homeassistant.core as ha
 from homeassistant.util import dt
 
@@ -35,11 +36,17 @@ from custom_components.irrigation_unlimited.irrigation_unlimited import (
     round_dt,
     IUAdjustment,
     IUBase,
+    IUDeadlines,
+    IUDTMin,
     IURun,
+    IURunQueue,
     IUJSONEncoder,
     IUSchedule,
     IUSequence,
+    IUSequenceRun,
+    IUZone,
     IURunStatus,
+    IURQStatus,
 )
 
 IUExam.quiet_mode()
@@ -261,6 +268,129 @@ async def test_nc_classes():
         "schedule: Manual"
     )
 
+    # IURunQueue
+    queue = IURunQueue()
+    schedule = object()
+    run1 = queue.add(adate, adate + one_sec * 120, one_sec, None, schedule, None, None)
+    run2 = queue.add(adate, adate + one_sec * 60, one_sec, None, schedule, None, None)
+    run3 = queue.add(adate, adate + one_sec * 60, one_sec, None, schedule, None, None)
+    manual = queue.add(adate, adate + one_sec * 180, one_sec, None, None, None, None)
+    assert manual.sort_key < run2.sort_key < run1.sort_key
+    assert queue.update_queue() == IURQStatus.SORTED | IURQStatus.UPDATED
+    assert list(queue) == [manual, run2, run3, run1]
+    assert queue.next_run == manual
+    assert queue.next_event() == adate + one_sec * 60
+    assert queue.find_run(run3) == 2
+    assert not queue.due
+    assert queue.remove_run(run2) == run2
+    assert list(queue) == [manual, run3, run1]
+    assert queue.update_queue() == IURQStatus(0)
+
+    # Transitions of the current run flag the queue as due
+    queue.update_run_status(adate + one_sec * 60)
+    assert queue.update_queue() == IURQStatus.UPDATED
+    assert queue.current_run == run3
+    assert queue.due
+    queue.due = False
+    assert queue.update_queue() == IURQStatus(0)
+    assert not queue.due
+
+
+async def test_deadlines():
+    """Test the wake up register."""
+    # pylint: disable=protected-access
+
+    adate = datetime.datetime(2021, 1, 4, 12, 10, 0, tzinfo=dt.UTC)
+    one_sec = datetime.timedelta(seconds=1)
+    owner1 = object()
+    owner2 = object()
+
+    deadlines = IUDeadlines()
+    assert deadlines.min == IUDTMin.eot
+    deadlines.set(owner1, adate + one_sec * 10)
+    deadlines.set(owner2, adate + one_sec * 5)
+    assert len(deadlines) == 2
+    assert deadlines.min == adate + one_sec * 5
+
+    # Moving a deadline supersedes the old one
+    deadlines.set(owner2, adate + one_sec * 20)
+    assert deadlines.min == adate + one_sec * 10
+    deadlines.set(owner1, None)
+    assert len(deadlines) == 1
+    assert deadlines.min == adate + one_sec * 20
+    deadlines.set(owner2, IUDTMin.eot)
+    assert deadlines.min == IUDTMin.eot
+
+    # Superseded entries do not accumulate
+    for i in range(100):
+        deadlines.set(owner1, adate + one_sec * i)
+    assert deadlines.min == adate + one_sec * 99
+    assert len(deadlines._heap) <= IUDeadlines.COMPACT_RATIO * 2
+    deadlines.clear()
+    assert len(deadlines) == 0
+    assert deadlines.min == IUDTMin.eot
+
+    # Due owners are removed and returned, the others stay
+    deadlines.set(owner1, adate + one_sec * 10)
+    deadlines.set(owner2, adate + one_sec * 5)
+    deadlines.set(owner2, adate + one_sec * 8)
+    assert deadlines.pop_due(adate + one_sec * 8) == [owner2]
+    assert not deadlines.pop_due(adate + one_sec * 9)
+    assert deadlines.min == adate + one_sec * 10
+    assert len(deadlines) == 1
+
+
+async def test_deadlines_visit(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test only the zones with something due are visited."""
+    # pylint: disable=unused-argument
+
+    async with IUExam(hass, "service_enable_disable.yaml") as exam:
+        await exam.begin_test(2)
+        await exam.run_until("2021-01-04 06:02")
+        zone = exam.coordinator.controllers[0].zones[1]
+        assert exam.coordinator.deadlines.min == exam.coordinator.next_awakening()
+
+        with patch.object(
+            IUZone, "update_sensor", autospec=True, return_value=False
+        ) as mock:
+            exam.coordinator.update_sensor(exam.virtual_time)
+            assert mock.call_count == 0
+
+            zone.request_update()
+            exam.coordinator.update_sensor(exam.virtual_time)
+            assert [call.args[0] for call in mock.call_args_list] == [zone]
+        await exam.finish_test()
+
+
+async def test_run_layout():
+    """Test the runs use a slotted layout."""
+
+    reset_granularity()
+    adate = datetime.datetime(2021, 1, 4, 12, 10, 0, tzinfo=dt.UTC)
+    one_min = datetime.timedelta(minutes=1)
+    schedule = object()
+
+    # Every class in the hierarchy declares slots so there is no __dict__
+    for cls in (IURun, IUSequenceRun):
+        for base in cls.__mro__[:-1]:
+            assert "__slots__" in vars(base), base.__name__
+
+    # Runs hold whole epoch seconds internally
+    run = IURun(adate, adate, one_min, None, schedule, None, None)
+    assert not hasattr(run, "__dict__")
+    assert run.start_time == adate
+    assert run.end_time == adate + one_min
+    assert run.sort_key == int(adate.timestamp())
+    run.end_time += one_min
+    assert run.end_time == adate + one_min * 2
+
+    queue = IURunQueue()
+    for i in range(10):
+        queue.add(adate, adate + one_min * i, one_min, None, schedule, None, None)
+    assert not any(hasattr(run, "__dict__") for run in queue)
+
 
 async def test_iu_classes(hass: ha.HomeAssistant, skip_dependencies, skip_history):
     """Test IU classes."""
@@ -0,0 +1,104 @@
+"""Test irrigation_unlimited long term statistics."""
+
+from unittest.mock import patch
+from datetime import datetime, timezone
+import homeassistant.core as ha
+from custom_components.irrigation_unlimited.lts import (
+    IUStatistics,
+    IUStatisticsHour,
+    IUStatisticsTracker,
+)
+from tests.iu_test_support import IUExam, mk_local
+
+IUExam.quiet_mode()
+
+
+def test_lts_tracker():
+    """Test the hourly bucketing of the transitions"""
+
+    def utc(hour: int, minute: int) -> datetime:
+        return datetime(2021, 1, 4, hour, minute, tzinfo=timezone.utc)
+
+    tracker = IUStatisticsTracker("c1_z1", "Zone 1")
+    tracker.update(utc(6, 50), True, None)
+    tracker.update(utc(7, 10), False, 2.5)
+    assert tracker.pop() == [IUStatisticsHour(utc(6, 0), 600, None)]
+
+    # A run spanning several hours
+    tracker.update(utc(7, 30), True, None)
+    tracker.roll(utc(8, 0))
+    tracker.update(utc(9, 15), False, 1.0)
+    assert tracker.pop() == [
+        IUStatisticsHour(utc(7, 0), 2400, 2.5),
+        IUStatisticsHour(utc(8, 0), 3600, None),
+    ]
+
+    # Idle hours are skipped
+    tracker.roll(utc(20, 5))
+    assert tracker.pop() == [IUStatisticsHour(utc(9, 0), 900, 1.0)]
+    tracker.roll(utc(23, 0))
+    assert not tracker.pop()
+    assert not tracker.is_on
+
+
+async def test_lts_export(hass: ha.HomeAssistant, allow_memory_db, skip_history):
+    """Test the hourly totals are pushed to the recorder"""
+    # pylint: disable=unused-argument
+
+    with patch(
+        "custom_components.irrigation_unlimited.lts.get_last_statistics",
+        return_value={},
+    ):
+        with patch(
+            "custom_components.irrigation_unlimited.lts.async_add_external_statistics"
+        ) as mock:
+            async with IUExam(hass, "test_lts.yaml", True) as exam:
+                await exam.run_test(1)
+                await hass.async_block_till_done()
+                exam.check_summary()
+                # Hours start on the local clock (Australia/Sydney)
+                hour_6 = mk_local("2021-01-04 06:00")
+                hour_7 = mk_local("2021-01-04 07:00")
+
+        rows: dict[str, list] = {}
+        for call in mock.call_args_list:
+            metadata, stats = call.args[1:3]
+            assert metadata["source"] == "irrigation_unlimited"
+            rows.setdefault(metadata["statistic_id"], []).extend(
+                (stat["start"], stat["state"], stat["sum"]) for stat in stats
+            )
+
+        assert rows["irrigation_unlimited:c1_z1_runtime"] == [
+            (hour_6, 10.0, 10.0),
+            (hour_7, 10.0, 20.0),
+        ]
+        assert rows["irrigation_unlimited:c1_z2_runtime"] == [(hour_7, 10.0, 10.0)]
+        assert rows["irrigation_unlimited:c1_m_runtime"] == [
+            (hour_6, 10.0, 10.0),
+            (hour_7, 20.0, 30.0),
+        ]
+        # No volume sensors so no volume statistics
+        assert "irrigation_unlimited:c1_z1_volume" not in rows
+
+
+def test_lts_metadata(hass: ha.HomeAssistant):
+    """Test the units of the statistics"""
+    # pylint: disable=protected-access
+
+    statistics = IUStatistics(hass)
+    tracker = IUStatisticsTracker("c1_z1", "Zone 1")
+    metadata = statistics._metadata(tracker, IUStatistics.RUNTIME)
+    assert metadata["statistic_id"] == "irrigation_unlimited:c1_z1_runtime"
+    assert metadata["unit_of_measurement"] == "min"
+    assert metadata["unit_class"] == "duration"
+
+    # No unit known for the volume sensor
+    metadata = statistics._metadata(tracker, IUStatistics.VOLUME)
+    assert metadata["unit_of_measurement"] is None
+    assert metadata["unit_class"] is None
+
+    tracker.unit = "L"
+    metadata = statistics._metadata(tracker, IUStatistics.VOLUME)
+    assert metadata["name"] == "Zone 1 volume"
+    assert metadata["unit_of_measurement"] == "L"
+    assert metadata["unit_class"] == "volume"
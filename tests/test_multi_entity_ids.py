@@ -1,12 +1,18 @@
 """Test irrigation_unlimited switches."""
 # pylint: disable=unused-import
-from datetime import timedelta, datetime
+from datetime import datetime
+from unittest.mock import patch
+import asyncio
+import time as tm
 import homeassistant.core as ha
 from homeassistant.const import (
     STATE_OFF,
     STATE_ON,
 )
 import homeassistant.util.dt as dt
+from custom_components.irrigation_unlimited.irrigation_unlimited import (
+    IUSwitchDispatcher,
+)
 from tests.iu_test_support import IUExam, mk_local
 
 IUExam.quiet_mode()
@@ -62,3 +68,160 @@ async def test_multi_entity_ids(
         await exam.finish_test()
 
         exam.check_summary()
+
+
+async def test_multi_entity_ids_dispatch(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test switch calls are grouped and ordered."""
+    # pylint: disable=unused-argument
+
+    async with IUExam(hass, "test_multi_entity_ids.yaml") as exam:
+
+        await exam.load_component("homeassistant")
+        await exam.load_component("input_boolean")
+
+        calls: list[tuple[str, str | list[str]]] = []
+
+        def handle_call_service(event: ha.Event) -> None:
+            if event.data["domain"] == "homeassistant":
+                calls.append(
+                    (event.data["service"], event.data["service_data"]["entity_id"])
+                )
+
+        hass.bus.async_listen("call_service", handle_call_service)
+
+        await exam.run_test(1)
+        exam.check_summary()
+
+        assert calls == [
+            ("turn_on", "input_boolean.dummy_s1"),
+            ("turn_on", ["input_boolean.dummy_s2", "input_boolean.dummy_s3"]),
+            ("turn_on", ["input_boolean.dummy_s4", "input_boolean.dummy_s5"]),
+            ("turn_off", ["input_boolean.dummy_s2", "input_boolean.dummy_s3"]),
+            ("turn_off", ["input_boolean.dummy_s4", "input_boolean.dummy_s5"]),
+            ("turn_off", "input_boolean.dummy_s1"),
+        ]
+        assert "homeassistant.turn_on" in exam.coordinator.dispatcher.latency
+
+        # Without a command queue repeated calls are all sent in order
+        calls.clear()
+        exam.coordinator.dispatcher.add("input_boolean.dummy_s1", True)
+        exam.coordinator.dispatcher.add("input_boolean.dummy_s1", False)
+        await hass.async_block_till_done()
+        assert calls == [
+            ("turn_on", "input_boolean.dummy_s1"),
+            ("turn_off", "input_boolean.dummy_s1"),
+        ]
+
+
+async def test_multi_entity_ids_dispatch_errors(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test a failed or stalled switch call does not hold up the rest."""
+    # pylint: disable=unused-argument
+
+    async with IUExam(hass, "test_multi_entity_ids.yaml") as exam:
+
+        await exam.load_component("homeassistant")
+        await exam.load_component("input_boolean")
+
+        async_call = ha.ServiceRegistry.async_call
+
+        async def service_call(self, domain, service, data, *args, **kwargs):
+            match data["entity_id"]:
+                case "input_boolean.dummy_s2":
+                    await asyncio.sleep(60)
+                case "input_boolean.dummy_s3":
+                    raise ValueError("Invalid entity")
+            return await async_call(self, domain, service, data, *args, **kwargs)
+
+        dispatcher = exam.coordinator.dispatcher
+        with (
+            patch.object(ha.ServiceRegistry, "async_call", service_call),
+            patch.object(IUSwitchDispatcher, "CALL_TIMEOUT", 0.05),
+            patch.object(exam.coordinator.logger, "log_switch_call_error") as mock,
+        ):
+            dispatcher.add("input_boolean.dummy_s2", True)
+            dispatcher.barrier()
+            dispatcher.add("input_boolean.dummy_s3", True)
+            dispatcher.barrier()
+            dispatcher.add("input_boolean.dummy_s1", True)
+            await hass.async_block_till_done()
+        assert [type(call.args[3]) for call in mock.call_args_list] == [
+            TimeoutError,
+            ValueError,
+        ]
+        assert hass.states.is_state("input_boolean.dummy_s1", STATE_ON) is True
+
+
+async def test_multi_entity_ids_queue(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test switch calls are rate limited and merged."""
+    # pylint: disable=unused-argument
+
+    async with IUExam(hass, "test_command_queue.yaml") as exam:
+
+        await exam.load_component("homeassistant")
+        await exam.load_component("input_boolean")
+
+        calls: list[tuple[str, str | list[str]]] = []
+        fired: dict[datetime, list[float]] = {}
+
+        def handle_call_service(event: ha.Event) -> None:
+            if event.data["domain"] == "homeassistant":
+                calls.append(
+                    (event.data["service"], event.data["service_data"]["entity_id"])
+                )
+                if exam.coordinator.tester.current_test is not None:
+                    fired.setdefault(exam.virtual_time, []).append(tm.perf_counter())
+
+        hass.bus.async_listen("call_service", handle_call_service)
+
+        # The check back is measured from when the last call leaves the queue.
+        # The wait is rounded up to the granularity (1 second on a live clock)
+        switch = exam.coordinator.controllers[0].zones[0].switch
+        await exam.begin_test(1)
+        await exam.run_until("2021-01-04 06:05:10")
+        # pylint: disable=protected-access
+        assert switch._check_back_wait == 1
+        assert switch._check_back_time == mk_local("2021-01-04 06:05:31")
+        await exam.finish_test()
+        exam.check_summary()
+
+        # One entity per call and spaced out
+        assert calls == [
+            ("turn_on", "input_boolean.dummy_s1"),
+            ("turn_on", "input_boolean.dummy_s2"),
+            ("turn_on", "input_boolean.dummy_s3"),
+            ("turn_on", "input_boolean.dummy_s4"),
+            ("turn_on", "input_boolean.dummy_s5"),
+            ("turn_off", "input_boolean.dummy_s2"),
+            ("turn_off", "input_boolean.dummy_s3"),
+            ("turn_off", "input_boolean.dummy_s4"),
+            ("turn_off", "input_boolean.dummy_s5"),
+            ("turn_off", "input_boolean.dummy_s1"),
+        ]
+        for batch in fired.values():
+            assert all(b - a >= 0.04 for a, b in zip(batch, batch[1:]))
+        assert max(len(batch) for batch in fired.values()) > 1
+
+        # A pending off is merged with the following on
+        calls.clear()
+        exam.coordinator.dispatcher.add("input_boolean.dummy_s1", False)
+        exam.coordinator.dispatcher.add("input_boolean.dummy_s1", True)
+        await hass.async_block_till_done()
+        assert calls == [("turn_on", "input_boolean.dummy_s1")]
+
+        # A call merged away while waiting in the queue is not sent
+        calls.clear()
+        exam.coordinator.dispatcher.add("input_boolean.dummy_s2", True)
+        exam.coordinator.dispatcher.add("input_boolean.dummy_s3", True)
+        await asyncio.sleep(0.01)
+        exam.coordinator.dispatcher.add("input_boolean.dummy_s3", False)
+        await hass.async_block_till_done()
+        assert calls == [
+            ("turn_on", "input_boolean.dummy_s2"),
+            ("turn_off", "input_boolean.dummy_s3"),
+        ]
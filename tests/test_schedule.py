@@ -1,7 +1,11 @@
 """Test irrigation_unlimited schedule"""
 # pylint: disable=unused-import
+from datetime import date, timedelta
 import homeassistant.core as ha
-from tests.iu_test_support import IUExam
+from tests.iu_test_support import IUExam, mk_local
+from custom_components.irrigation_unlimited.irrigation_unlimited import (
+    IUSchedule,
+)
 
 IUExam.quiet_mode()
 
@@ -17,3 +21,51 @@ async def test_schedule(hass: ha.HomeAssistant, skip_dependencies, skip_history)
     async with IUExam(hass, "test_schedule_from_until.yaml") as exam:
         await exam.run_all()
         exam.check_summary()
+
+
+async def test_schedule_calendar(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test the compiled schedule calendar."""
+    async with IUExam(hass, "test_schedule_from_until.yaml") as exam:
+        sch = IUSchedule(hass, exam.coordinator, 0)
+        sch.load(
+            {
+                "time": "06:05",
+                "duration": "00:10",
+                "day": {"every_n_days": 14, "start_n_days": "2021-09-01"},
+            }
+        )
+        assert sch.next_active_day(date(2021, 9, 2), date(2021, 12, 31)) == date(
+            2021, 9, 15
+        )
+        assert sch.next_active_day(date(2021, 9, 16), date(2021, 9, 28)) is None
+        # Beyond the compiled window
+        assert sch.next_active_day(date(2021, 9, 16), date(2023, 1, 1)) == date(
+            2021, 9, 29
+        )
+        assert sch.next_active_day(date(2022, 9, 1), date(2023, 1, 1)) == date(
+            2022, 9, 14
+        )
+
+        # Schedule times are on the local clock
+        stime = mk_local("2021-09-02 06:00")
+        assert sch.get_next_run(
+            stime, stime + timedelta(days=30), timedelta(minutes=10), False
+        ) == mk_local("2021-09-15 06:05")
+        assert (
+            sch.get_next_run(
+                stime, stime + timedelta(days=3), timedelta(minutes=10), False
+            )
+            is None
+        )
+
+        # Reloading the schedule invalidates the calendar
+        sch.load({"from": date(2021, 12, 30), "until": date(2021, 1, 2)}, True)
+        sch.load({"day": "odd"}, True)
+        assert sch.next_active_day(date(2021, 9, 2), date(2022, 12, 31)) == date(
+            2021, 12, 31
+        )
+        assert sch.next_active_day(date(2022, 1, 2), date(2022, 12, 31)) == date(
+            2022, 12, 31
+        )
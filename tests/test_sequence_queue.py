@@ -1,7 +1,13 @@
 """irrigation_unlimited test sequence queue"""
 import datetime
+from datetime import timedelta
 import zoneinfo
 import homeassistant.core as ha
+from custom_components.irrigation_unlimited.irrigation_unlimited import (
+    IUSequenceQueue,
+    IUSequenceRun,
+    IUSchedule,
+)
 from tests.iu_test_support import IUExam
 
 IUExam.quiet_mode()
@@ -298,3 +304,66 @@ async def test_fill_and_drain(hass: ha.HomeAssistant, skip_dependencies, skip_hi
 
         await exam.finish_test()
         exam.check_summary()
+
+
+async def test_sequence_queue_tail(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test an earlier run does not replace the schedule tail."""
+    # pylint: disable=unused-argument
+
+    async with IUExam(hass, "test_sequence_queue.yaml") as exam:
+        await exam.begin_test(1)
+        queue = exam.coordinator.controllers[0].sequences[0].runs
+        schedule = queue[0].schedule
+        tail = queue.find_last_run(schedule)
+        assert tail is not None
+        earliest = min(
+            (run for run in queue if run.schedule == schedule),
+            key=lambda run: run.end_time,
+        )
+        assert earliest is not tail
+        queue.add(earliest)
+        assert queue.find_last_run(schedule) is tail
+        queue.pop_run(len(queue) - 1)
+        await exam.finish_test()
+
+
+async def test_sequence_queue_tail_altered(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test the schedule tail follows paused, resumed and advanced runs."""
+    # pylint: disable=unused-argument
+
+    def scan(queue: IUSequenceQueue, schedule: IUSchedule) -> IUSequenceRun:
+        """The linear scan the tail index stands in for"""
+        result = None
+        next_time = None
+        for sqr in queue:
+            if sqr.schedule == schedule:
+                for run in sqr.runs:
+                    if next_time is None or run.end_time > next_time:
+                        next_time = run.start_time
+                        result = run
+        return result.sequence_run if result is not None else None
+
+    async with IUExam(hass, "test_sequence_queue.yaml") as exam:
+        exam.no_check()  # The run times are altered below
+        await exam.begin_test(1)
+        await exam.run_until("2023-11-06 06:10")
+        queue = exam.coordinator.controllers[0].sequences[0].runs
+        sqr = queue.current_run
+        stime = exam.virtual_time
+        tail = queue.find_last_run(sqr.schedule)
+        assert tail is not sqr
+
+        sqr.pause(stime)
+        assert queue.find_last_run(sqr.schedule) is scan(queue, sqr.schedule)
+        sqr.resume(stime + timedelta(minutes=5))
+        assert queue.find_last_run(sqr.schedule) is scan(queue, sqr.schedule)
+
+        # Push the current run out past the others
+        sqr.advance(stime, timedelta(days=7))
+        assert queue.find_last_run(sqr.schedule) is sqr
+        assert scan(queue, sqr.schedule) is sqr
+        await exam.finish_test()
@@ -1196,3 +1196,27 @@ async def test_service_sequence_id_list(
         )
         await exam.finish_test()
         exam.check_summary()
+
+
+async def test_service_disable_controller_runs(
+    hass: ha.HomeAssistant, skip_dependencies, skip_history
+):
+    """Test disabling a controller leaves the pending zone runs in place."""
+
+    async with IUExam(hass, "service_enable_disable.yaml") as exam:
+        await exam.begin_test(7)
+        controller = exam.coordinator.controllers[0]
+        before = [list(zone.runs) for zone in controller.zones]
+        assert all(before)
+        await exam.call(
+            SERVICE_DISABLE,
+            {"entity_id": "binary_sensor.irrigation_unlimited_c1_m"},
+        )
+        assert not controller.stale_zones()
+        after = [list(zone.runs) for zone in controller.zones]
+        assert all(
+            run_a is run_b
+            for runs_a, runs_b in zip(before, after)
+            for run_a, run_b in zip(runs_a, runs_b)
+        )
+        await exam.finish_test()
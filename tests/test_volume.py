@@ -1,7 +1,7 @@
 """irrigation_unlimited volume test module"""
 
 from unittest.mock import patch
-from datetime import datetime
+from datetime import datetime, timedelta
 import copy
 import asyncio
 from collections.abc import Iterator
@@ -10,8 +10,10 @@ from homeassistant.util import dt
 from custom_components.irrigation_unlimited.const import (
     DOMAIN,
     EVENT_FINISH,
+    EVENT_FLOW_ALERT,
     EVENT_VALVE_ON,
     EVENT_VALVE_OFF,
+    SERVICE_CANCEL,
     SERVICE_TIME_ADJUST,
 )
 from custom_components.irrigation_unlimited.irrigation_unlimited import (
@@ -246,6 +248,179 @@ async def test_volume_class(hass: ha.HomeAssistant, skip_dependencies, skip_hist
         exam.check_summary()
 
 
+async def test_volume_window(hass: ha.HomeAssistant, skip_dependencies, skip_history):
+    """Test the flow rate moving average window"""
+
+    async with IUExam(hass, "test_volume_window.yaml") as exam:
+        await exam.load_component("input_text")
+        volume = exam.coordinator.controllers[0].zones[0].volume
+
+        with patch.object(IUVolume, "event_hook") as mock:
+
+            def state_change(event: ha.Event) -> ha.Event:
+                event.time_fired_timestamp = exam.virtual_time.timestamp()
+                return event
+
+            mock.side_effect = state_change
+            await exam.begin_test(1)
+            for minute, value in enumerate(["100", "101", "103", "106", "110"]):
+                await exam.run_until(f"2021-01-04 06:{minute + 6:02}")
+                await set_sensor(hass, "input_text.dummy_sensor_1", value)
+            await hass.async_block_till_done()
+
+            # Only the last three rates (2, 3, 4) are in the window
+            assert volume.flow_rate_sma == 3.0
+            assert volume.flow_rate == 2.5
+            assert volume.total == 10.0
+            await exam.finish_test()
+            exam.check_summary()
+
+
+async def test_volume_shared(hass: ha.HomeAssistant, skip_dependencies, skip_history):
+    """Test a meter shared by the controller and zones is read once"""
+
+    async with IUExam(hass, "test_volume_shared.yaml") as exam:
+        await exam.load_component("input_text")
+
+        with patch.object(IUVolume, "event_hook") as mock:
+
+            def state_change(event: ha.Event) -> ha.Event:
+                event.time_fired_timestamp = exam.virtual_time.timestamp()
+                return event
+
+            mock.side_effect = state_change
+            with patch.object(
+                IUVolume, "read_sensor", wraps=IUVolume.read_sensor
+            ) as mock_read:
+                await exam.begin_test(1)
+                await exam.run_until("2021-01-04 06:06")
+                assert IUVolume.trackers == 1
+                for minute, value in [(6, "10"), (10, "14"), (14, "20")]:
+                    await exam.run_until(f"2021-01-04 06:{minute:02}")
+                    await set_sensor(hass, "input_text.dummy_sensor", value)
+                await hass.async_block_till_done()
+                assert mock.call_count == 3
+                assert mock_read.call_count == 3
+                await exam.finish_test()
+                exam.check_summary()
+                assert IUVolume.trackers == 0
+
+        for entity in ["c1_m", "c1_z1", "c1_z2"]:
+            sta = hass.states.get(f"binary_sensor.irrigation_unlimited_{entity}")
+            assert sta.attributes["volume"] == 10.0
+
+
+async def test_volume_notify(hass: ha.HomeAssistant, skip_dependencies, skip_history):
+    """Test the volume notifications are coalesced and only summaries logged"""
+
+    async with IUExam(hass, "test_volume_notify.yaml") as exam:
+        await exam.load_component("input_text")
+        volume = exam.coordinator.controllers[0].zones[0].volume
+
+        notifications: list[tuple[datetime, float]] = []
+
+        def listener(stime: datetime, zone, total) -> None:
+            notifications.append((stime, float(total)))
+
+        finish_volumes: list[float] = []
+
+        def handle_finish_event(event: ha.Event) -> None:
+            finish_volumes.append(event.data["volume"])
+
+        hass.bus.async_listen(f"{DOMAIN}_{EVENT_FINISH}", handle_finish_event)
+
+        remove = volume.track_volume_change(1, listener)
+
+        with patch.object(IUVolume, "event_hook") as mock:
+
+            def state_change(event: ha.Event) -> ha.Event:
+                event.time_fired_timestamp = exam.virtual_time.timestamp()
+                return event
+
+            mock.side_effect = state_change
+            with patch.object(IULogger, "_format") as mock_log:
+                await exam.begin_test(1)
+                for minute, value in enumerate(["10", "11", "13", "16", "20", "25"]):
+                    await exam.run_until(f"2021-01-04 06:{minute + 6:02}")
+                    await set_sensor(hass, "input_text.dummy_sensor_1", value)
+                await exam.finish_test()
+                await hass.async_block_till_done()
+                areas = [call.args[1] for call in mock_log.call_args_list]
+                assert "VOLUME_READING" not in areas
+                assert areas.count("VOLUME_SUMMARY") == 1
+            remove()
+
+            # The reading at 06:11 is held back and sent when the zone finishes
+            assert notifications == [
+                (mk_local("2021-01-04 06:06"), 0.0),
+                (mk_local("2021-01-04 06:08"), 3.0),
+                (mk_local("2021-01-04 06:10"), 10.0),
+                (mk_local("2021-01-04 06:11"), 15.0),
+            ]
+
+            # The held back total reaches the sequence before it finishes
+            await exam.begin_test(2)
+            for minute, value in enumerate(["30", "31", "33", "36", "40", "45"]):
+                await exam.run_until(f"2021-01-05 06:{minute + 6:02}")
+                await set_sensor(hass, "input_text.dummy_sensor_1", value)
+            await exam.finish_test()
+            exam.check_summary()
+            assert finish_volumes == [volume.total] == [15.0]
+
+
+async def test_volume_alert(hass: ha.HomeAssistant, skip_dependencies, skip_history):
+    """Test the target volume and flow rate alerts"""
+    # pylint: disable=protected-access
+
+    async with IUExam(hass, "test_volume_alert.yaml") as exam:
+        zone1, zone2 = exam.coordinator.controllers[0].zones[0:2]
+
+        async def run(volume: IUVolume, start: datetime, step: float) -> None:
+            # Nothing flows in the first minute while the valve opens
+            volume.start_record(start)
+            for minute in range(12):
+                await volume.sensor_reading(
+                    start + timedelta(minutes=minute), 100 + max(minute - 1, 0) * step
+                )
+            volume.end_record(start + timedelta(minutes=12))
+
+        with patch.object(exam.coordinator, "notify_valve") as mock:
+            # Learn the baseline over three normal runs. Each run settles
+            # at 1 unit a minute after the ramp up
+            start = mk_local("2021-01-04 06:00")
+            for _ in range(IUVolume.BASELINE_RUNS):
+                await run(zone1.volume, start, 1)
+                start += timedelta(hours=1)
+            assert zone1.volume.baseline == 60.0
+            assert mock.call_count == 0
+
+            # Double the flow
+            await run(zone1.volume, start, 2)
+            assert mock.call_count == 1
+            assert mock.call_args.args[0] == IUVolume.ALERT_HIGH_FLOW
+            assert mock.call_args.args[3] == zone1.switch.switch_entity_id
+            assert mock.call_args.args[6] == EVENT_FLOW_ALERT
+            assert zone1.volume.baseline == 60.0
+
+            # Target volume reached
+            mock.reset_mock()
+            with patch.object(
+                ha.ServiceRegistry,
+                "async_call",
+                autospec=True,
+                side_effect=ha.ServiceRegistry.async_call,
+            ) as mock_call:
+                await run(zone2.volume, start, 1)
+                await hass.async_block_till_done()
+            assert mock.call_count == 1
+            assert mock.call_args.args[0] == IUVolume.ALERT_TARGET
+            assert mock_call.call_args.args[2] == SERVICE_CANCEL
+
+        # A reload starts learning afresh
+        zone1.volume.load({}, None)
+        assert zone1.volume.baseline is None
+
+
 async def test_volume_extensive(
     hass: ha.HomeAssistant, skip_dependencies, skip_history
 ):
@@ -2011,10 +2186,13 @@ async def test_volume_live_history(hass: ha.HomeAssistant, allow_memory_db):
         # Strip dates and duration from history
         hist = copy.deepcopy(exam.coordinator.history._cache)
         for entity, history in hist.items():
+            history["timeline"] = history["timeline"].as_list()
             for id, timeline in enumerate(history["timeline"]):
                 del hist[entity]["timeline"][id]["start"]
                 del hist[entity]["timeline"][id]["end"]
             history["today_on"] = history["today_on"].volume
+            del history["last_24h"]
+            del history["last_7d"]
         assert hist == {
             "binary_sensor.irrigation_unlimited_c1_m": {
                 "timeline": [